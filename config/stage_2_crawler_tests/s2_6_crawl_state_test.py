@@ -0,0 +1,245 @@
+"""
+Crawl journal, shared crawl state and article renumbering checks
+"""
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from core_utils.article import Article
+from core_utils.crawl_journal import CrawlJournal
+from core_utils.shared_state import SQLiteFrontier, SQLiteJournal, SQLiteState
+from scrapper import move_article
+
+
+class CrawlJournalTest(unittest.TestCase):
+    """
+    Checks article id allocation of the crawl journal
+    """
+
+    def setUp(self) -> None:
+        self.journal_path = Path(tempfile.mkdtemp()) / 'crawl_journal.json'
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.journal_path.parent)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_compact_fills_released_ids(self):
+        """
+        Ensure ids released by failed articles are filled with the last articles
+        """
+        journal = CrawlJournal(self.journal_path)
+        ids = [journal.reserve_article_id(url) for url in ('a', 'b', 'c', 'd')]
+        self.assertEqual([1, 2, 3, 4], ids)
+        journal.release_article_id('b', 2)
+        for url, article_id in (('a', 1), ('c', 3), ('d', 4)):
+            journal.record(url, article_id, 'hash')
+
+        self.assertEqual([(4, 2)], journal.compact())
+        self.assertEqual(2, journal.get_article_id('d'))
+        self.assertEqual(4, journal.reserve_article_id('e'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_ids_reserved_before_restart_are_reused(self):
+        """
+        Ensure ids reserved but not recorded by a crawl that died leave no gaps
+        """
+        journal = CrawlJournal(self.journal_path)
+        for url in ('a', 'b', 'c'):
+            journal.reserve_article_id(url)
+        journal.record('a', 1, 'hash')
+        journal.record('c', 3, 'hash')
+        journal.save()
+
+        restarted_journal = CrawlJournal(self.journal_path)
+        self.assertEqual(2, restarted_journal.reserve_article_id('b'))
+        self.assertEqual(4, restarted_journal.reserve_article_id('e'))
+
+        restarted_journal = CrawlJournal(self.journal_path)
+        self.assertEqual([(3, 2)], restarted_journal.compact())
+
+
+class SQLiteFrontierTest(unittest.TestCase):
+    """
+    Checks the frontier shared by crawler processes
+    """
+
+    def setUp(self) -> None:
+        self.state_path = Path(tempfile.mkdtemp()) / 'crawl_state.sqlite'
+        self.frontier = SQLiteFrontier(SQLiteState(self.state_path), max_attempts=2)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.state_path.parent)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_urls_are_claimed_once_by_priority(self):
+        """
+        Ensure URLs are handed out once, the highest priority first
+        """
+        self.assertTrue(self.frontier.add('a', 1))
+        self.assertTrue(self.frontier.add('b', 2))
+        self.assertFalse(self.frontier.add('a', 3))
+
+        self.assertEqual('b', self.frontier.pop())
+        self.assertEqual('a', self.frontier.pop())
+        self.assertIsNone(self.frontier.pop())
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_failed_urls_are_requeued_until_attempts_are_over(self):
+        """
+        Ensure failed URL goes behind fresh ones and is dropped once its attempts are over
+        """
+        self.frontier.add('a', 2)
+        self.assertEqual('a', self.frontier.pop())
+        self.frontier.add('b', 1)
+
+        self.assertTrue(self.frontier.requeue('a'))
+        self.assertEqual('b', self.frontier.pop())
+        self.assertEqual('a', self.frontier.pop())
+        self.assertFalse(self.frontier.requeue('a'))
+        self.assertIsNone(self.frontier.pop())
+        self.assertEqual([{'url': 'b', 'priority': 1, 'attempts': 0}], self.frontier.get_entries())
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_deferred_urls_wait_for_their_time(self):
+        """
+        Ensure deferred URL is not handed out before its delay passes
+        """
+        self.frontier.add('a')
+        self.frontier.defer(self.frontier.pop(), 0.2)
+
+        self.assertIsNone(self.frontier.pop())
+        self.assertEqual(0, len(self.frontier))
+        self.assertGreater(self.frontier.get_delay(), 0)
+        time.sleep(0.3)
+        self.assertIsNone(self.frontier.get_delay())
+        self.assertEqual('a', self.frontier.pop())
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_resumed_crawl_takes_up_claimed_urls(self):
+        """
+        Ensure URLs claimed by processes of the interrupted crawl are handed out again
+        and all URLs found by it are known to the resumed crawl
+        """
+        for url in ('a', 'b', 'c'):
+            self.frontier.add(url)
+        self.frontier.mark_done(self.frontier.pop())
+        claimed_url = self.frontier.pop()
+
+        resumed_frontier = SQLiteFrontier(SQLiteState(self.state_path), max_attempts=2)
+        self.assertEqual('c', resumed_frontier.pop())
+        self.assertIsNone(resumed_frontier.pop())
+        resumed_frontier.release_claims()
+        self.assertEqual(claimed_url, resumed_frontier.pop())
+        self.assertEqual(['a', 'b', 'c'], resumed_frontier.get_urls())
+
+
+class SQLiteJournalTest(unittest.TestCase):
+    """
+    Checks article id allocation of the journal shared by crawler processes
+    """
+
+    def setUp(self) -> None:
+        self.assets_path = Path(tempfile.mkdtemp())
+        self.patcher = mock.patch('core_utils.shared_state.ASSETS_PATH', self.assets_path)
+        self.patcher.start()
+        self.state_path = self.assets_path / 'crawl_state.sqlite'
+        self.journal = SQLiteJournal(SQLiteState(self.state_path))
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        shutil.rmtree(self.assets_path)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_released_ids_are_reused(self):
+        """
+        Ensure the lowest released id is given to the next new URL and known URLs keep their ids
+        """
+        ids = [self.journal.reserve_article_id(url) for url in ('a', 'b', 'c')]
+        self.assertEqual([1, 2, 3], ids)
+        self.journal.release_article_id('b', 2)
+        self.journal.record('a', 1, 'hash')
+
+        self.assertEqual(2, self.journal.reserve_article_id('d'))
+        self.assertEqual(1, self.journal.reserve_article_id('a'))
+        self.assertEqual(4, self.journal.reserve_article_id('e'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_compact_fills_ids_of_dead_processes(self):
+        """
+        Ensure ids released or reserved by processes that died are filled with the last articles
+        """
+        for url in ('a', 'b', 'c', 'd'):
+            self.journal.reserve_article_id(url)
+        self.journal.release_article_id('a', 1)
+        self.journal.record('c', 3, 'hash')
+        self.journal.record('d', 4, 'hash')
+
+        resumed_journal = SQLiteJournal(SQLiteState(self.state_path))
+        self.assertEqual([(4, 1), (3, 2)], resumed_journal.compact())
+        self.assertEqual(1, resumed_journal.get_article_id('d'))
+        self.assertEqual(3, resumed_journal.reserve_article_id('e'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_unchanged_article_needs_its_file(self):
+        """
+        Ensure article is unchanged only if its hash matches and its text is saved
+        """
+        self.journal.record('a', 1, 'hash')
+        self.assertFalse(self.journal.is_unchanged('a', 'hash'))
+        (self.assets_path / '1_raw.txt').write_text('text', encoding='utf-8')
+        self.assertTrue(self.journal.is_unchanged('a', 'hash'))
+        self.assertFalse(self.journal.is_unchanged('a', 'new hash'))
+
+
+class MoveArticleTest(unittest.TestCase):
+    """
+    Checks that renumbered articles keep their files
+    """
+
+    def setUp(self) -> None:
+        self.assets_path = Path(tempfile.mkdtemp())
+        self.patchers = [mock.patch(f'{module}.ASSETS_PATH', self.assets_path)
+                         for module in ('core_utils.article', 'scrapper')]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.assets_path)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_6_crawl_state_checks
+    def test_move_article_keeps_meta_data(self):
+        """
+        Ensure article moved to a free id keeps its text and meta data
+        """
+        meta = {'id': 3, 'url': 'http://journal.asu.ru/urisl/article/view/1', 'title': 'Title',
+                'date': '2021-01-01 00:00:00', 'author': 'Author', 'topics': ['topic'], 'source': 'html'}
+        (self.assets_path / '3_raw.txt').write_text('text', encoding='utf-8')
+        (self.assets_path / '3_meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+        move_article(3, 1)
+
+        self.assertEqual(['1_meta.json', '1_raw.txt'], sorted(path.name for path in self.assets_path.iterdir()))
+        article = Article(url=None, article_id=1)
+        self.assertEqual('text', article.get_raw_text())
+        self.assertEqual('Author', article.author)
+        self.assertEqual(meta['url'], article.url)
+        moved_meta = json.loads((self.assets_path / '1_meta.json').read_text(encoding='utf-8'))
+        self.assertEqual(1, moved_meta['id'])
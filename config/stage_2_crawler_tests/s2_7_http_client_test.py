@@ -0,0 +1,172 @@
+"""
+HTTP client download checks against a local server
+"""
+import gzip
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from core_utils.blob_store import BlobStore
+from core_utils.http_cache import ResponseCache
+from core_utils.http_utils import DownloadTooLargeError, HTTPClient
+
+FILE_CONTENT = bytes(range(256)) * 1000
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    Serves the test file as is, gzip-encoded, cut in the middle or too large,
+    answers conditional requests for the unchanged file with 304
+    """
+    dropped_paths = set()
+    statuses = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends the test file in the way the path asks for
+        """
+        body = FILE_CONTENT
+        headers = {'ETag': '"file"'}
+        status = 200
+        if self.path == '/gzip':
+            body = gzip.compress(FILE_CONTENT)
+            headers['Content-Encoding'] = 'gzip'
+        if self.headers.get('If-None-Match') == headers['ETag']:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        range_header = self.headers.get('Range')
+        if range_header:
+            start = int(range_header[len('bytes='):-1])
+            headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+            body = body[start:]
+            status = 206
+        self.statuses.append(status)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.path == '/drop' and self.path not in self.dropped_paths:
+            self.dropped_paths.add(self.path)
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class HTTPClientDownloadTest(unittest.TestCase):
+    """
+    Checks that files are downloaded whole and exactly
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FileHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.client = HTTPClient({'backoff_factor': 0})
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_download_returns_whole_file(self):
+        """
+        Ensure download returns the file byte for byte
+        """
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/file'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_download_decodes_gzip_body(self):
+        """
+        Ensure a body the server encodes despite Accept-Encoding is decoded
+        """
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/gzip'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_download_resumes_dropped_connection(self):
+        """
+        Ensure download continues from the last received byte after the connection drops
+        """
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/drop'))
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_download_stops_at_max_size(self):
+        """
+        Ensure files larger than max_size are rejected
+        """
+        with self.assertRaises(DownloadTooLargeError):
+            self.client.download(f'{self.url}/file', max_size=1000)
+
+
+class BlobStoreDownloadTest(unittest.TestCase):
+    """
+    Checks that files kept in the blob store are revalidated instead of downloaded again
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FileHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        self.blob_store = BlobStore(self.root / 'blobs', max_size=10 ** 7, max_age=60)
+        self.client = HTTPClient({'backoff_factor': 0}, cache=ResponseCache(self.root / 'cache', 10 ** 7))
+        FileHandler.statuses.clear()
+
+    def tearDown(self) -> None:
+        self.client.close()
+        shutil.rmtree(self.root)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_unchanged_file_is_read_from_blob_store(self):
+        """
+        Ensure the response cache keeps no body of the file and an unchanged file is taken from the blob store
+        """
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/file', blob_store=self.blob_store))
+        self.assertEqual([], list((self.root / 'cache').glob('*.body')))
+
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/file', blob_store=self.blob_store))
+        self.assertEqual([200, 304], FileHandler.statuses)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_7_http_client_checks
+    def test_file_missing_from_blob_store_is_downloaded_again(self):
+        """
+        Ensure the file is downloaded whole if the blob store no longer keeps it
+        """
+        self.client.download(f'{self.url}/file', blob_store=self.blob_store)
+        for blob_path in (self.root / 'blobs').glob('*/*'):
+            blob_path.unlink()
+
+        self.assertEqual(FILE_CONTENT, self.client.download(f'{self.url}/file', blob_store=self.blob_store))
+        self.assertEqual([200, 304, 200], FileHandler.statuses)
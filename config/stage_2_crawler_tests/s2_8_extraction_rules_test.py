@@ -0,0 +1,74 @@
+"""
+Article page extraction checks against a hand-made page with OJS article page markup
+"""
+import unittest
+
+import pytest
+from bs4 import BeautifulSoup
+
+from config.test_params import TEST_FILES_FOLDER
+from scrapper import ARTICLE_PAGE_FIELDS, get_page_rules
+
+# the sample is not a saved journal page: it follows markup of the default OJS 3 theme with invented content
+ARTICLE_PAGE_PATH = TEST_FILES_FOLDER / 'ojs_article_page_sample.html'
+
+
+class ExtractionRulesTest(unittest.TestCase):
+    """
+    Checks that precompiled rules find the same article page fields as BeautifulSoup does
+    """
+
+    def setUp(self) -> None:
+        self.page = ARTICLE_PAGE_PATH.read_text(encoding='utf-8')
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_8_extraction_rules_checks
+    def test_article_page_fields_are_extracted(self):
+        """
+        Ensure all fields of the sample article page are extracted
+        """
+        values = get_page_rules(ARTICLE_PAGE_FIELDS).extract(self.page)
+
+        self.assertEqual({
+            'title': 'Структура русского диалектного слова',
+            'author': 'Иванова Мария Петровна',
+            'keywords': 'диалектология,\tлексика, словообразование',
+            'date': '2021-06-30',
+            'html_galley_urls': ['http://journal.asu.ru/urisl/article/view/9999/7001'],
+            'pdf_galley_urls': ['http://journal.asu.ru/urisl/article/view/9999/7002'],
+            'issue_url': 'http://journal.asu.ru/urisl/issue/view/321'
+        }, values)
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_8_extraction_rules_checks
+    def test_fields_match_beautiful_soup(self):
+        """
+        Ensure extracted fields are the ones BeautifulSoup finds on the page
+        """
+        article_bs = BeautifulSoup(self.page, 'lxml')
+        expected = {
+            'title': article_bs.find('h1', class_='page_title').text.strip(),
+            'author': article_bs.find('ul', class_='item authors').find('li').find('span').text.strip(),
+            'keywords': article_bs.find('div', class_='item keywords').find('span', class_='value').text.strip(),
+            'date': article_bs.find('div', class_='item published').find('div', class_='value').text.strip(),
+            'pdf_galley_urls': [link_bs['href'] for link_bs in
+                                article_bs.find_all('a', class_='obj_galley_link pdf')],
+            'issue_url': article_bs.select_one('nav ol li:nth-child(3) a')['href']
+        }
+
+        values = get_page_rules(ARTICLE_PAGE_FIELDS).extract(self.page)
+
+        self.assertEqual(expected, {field: values[field] for field in expected})
+
+    @pytest.mark.mark10
+    @pytest.mark.stage_2_8_extraction_rules_checks
+    def test_site_fields_replace_default_ones(self):
+        """
+        Ensure fields given by a site profile replace default fields and keep the rest
+        """
+        site_fields = {'title': {'tag': 'meta', 'value_path': '@content[../@name="citation_title"]'}}
+
+        values = get_page_rules(ARTICLE_PAGE_FIELDS, site_fields).extract(self.page)
+
+        self.assertEqual('Структура русского диалектного слова', values['title'])
+        self.assertEqual('2021-06-30', values['date'])
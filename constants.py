@@ -6,5 +6,14 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent
 ASSETS_PATH = PROJECT_ROOT / 'tmp' / 'articles'
+CACHE_PATH = PROJECT_ROOT / 'tmp' / 'http_cache'
+RESPONSE_ARCHIVE_PATH = PROJECT_ROOT / 'tmp' / 'response_archive'
+CRAWL_JOURNAL_PATH = PROJECT_ROOT / 'tmp' / 'crawl_journal.json'
+FRONTIER_PATH = PROJECT_ROOT / 'tmp' / 'crawl_frontier.txt'
+CHECKPOINT_PATH = PROJECT_ROOT / 'tmp' / 'crawl_checkpoint.json'
+SHARED_STATE_PATH = PROJECT_ROOT / 'tmp' / 'crawl_state.sqlite'
+TRACE_PATH = PROJECT_ROOT / 'tmp' / 'crawl_trace.jsonl'
+METRICS_PATH = PROJECT_ROOT / 'tmp' / 'crawl_metrics.prom'
+BLOB_STORE_PATH = PROJECT_ROOT / 'tmp' / 'blobs'
 CRAWLER_CONFIG_PATH = PROJECT_ROOT / 'scrapper_config.json'
 DOMAIN = "http://journal.asu.ru/urisl/"
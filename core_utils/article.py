@@ -20,56 +20,101 @@ def date_from_meta(date_txt):
     return datetime.datetime.strptime(date_txt, "%Y-%m-%d %H:%M:%S")
 
 
+class _MetaField:
+    """
+    Article attribute that is read from the meta file on first access.
+    Assignment loads the meta file first as well, so that loading never overwrites assigned values
+    """
+
+    def __init__(self):
+        self._name = None
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, article, owner=None):
+        if article is None:
+            return self
+        return article.load_meta()[self._name]
+
+    def __set__(self, article, value):
+        article.load_meta()[self._name] = value
+
+
 class Article:
     """
     Article class implementation.
-    Stores article metadata and knows how to work with articles
+    Stores article metadata and knows how to work with articles.
+    Metadata is loaded from the meta file lazily, on first access to any of its fields
     """
 
+    __slots__ = ('_url', 'article_id', 'text', '_meta')
+
+    url = _MetaField()
+    title = _MetaField()
+    date = _MetaField()
+    author = _MetaField()
+    topics = _MetaField()
+    text_source = _MetaField()
+
     def __init__(self, url, article_id):
-        self.url = url
+        self._url = url
         self.article_id = article_id
-
-        self.title = ''
-        self.date = None
-        self.author = ''
-        self.topics = []
         self.text = ''
-
-        meta_file = self.get_meta_file_path()
-        if meta_file.exists():
-            self.from_meta_json(meta_file)
+        # meta data is kept in a dict that is created once it is loaded or assigned
+        self._meta = None
 
     def save_raw(self):
         """
         Saves raw text and article meta data
         """
-        article_meta_name = "{}_meta.json".format(self.article_id)
-
         with open(self.get_raw_text_path(), 'w', encoding='utf-8') as file:
             file.write(self.text)
 
         if self.author:
-            with (ASSETS_PATH / article_meta_name).open("w", encoding='utf-8') as file:
-                json.dump(self._get_meta(), file, sort_keys=False,
-                          indent=4, ensure_ascii=False, separators=(',', ': '))
+            self.save_meta()
+
+    def save_meta(self):
+        """
+        Saves article meta data
+        """
+        with self.get_meta_file_path().open("w", encoding='utf-8') as file:
+            json.dump(self._get_meta(), file, sort_keys=False,
+                      indent=4, ensure_ascii=False, separators=(',', ': '))
+
+    def load_meta(self) -> dict:
+        """
+        Loads meta data from the meta file if it exists and is not loaded yet, returns meta data
+        """
+        if self._meta is None:
+            self._meta = {'url': self._url, 'title': '', 'date': None, 'author': '', 'topics': [],
+                          'text_source': None}
+            meta_file = self.get_meta_file_path()
+            if meta_file.exists():
+                self._read_meta(meta_file)
+        return self._meta
 
     def from_meta_json(self, json_path: str):
         """
         Loads meta.json file and writes its data
         """
-        with open(json_path, encoding='utf-8') as meta_file:
-            meta = json.load(meta_file)
-
-        self.url = meta.get('url', None)
-        self.title = meta.get('title', '')
-        self.date = date_from_meta(meta.get('date', None))
-        self.author = meta.get('author', None)
-        self.topics = meta.get('topics', None)
+        self._meta = {}
+        self._read_meta(json_path)
 
         # intentionally leave it empty
         self.text = None
 
+    def _read_meta(self, json_path: str):
+        with open(json_path, encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+
+        self._meta.update(url=meta.get('url', None),
+                          title=meta.get('title', ''),
+                          date=date_from_meta(meta.get('date', None)),
+                          author=meta.get('author', None),
+                          topics=meta.get('topics', None),
+                          text_source=meta.get('source', None))
+
     def get_raw_text(self):
         """
         Gets a raw text for requested article
@@ -96,7 +141,8 @@ class Article:
             'title': self.title,
             'date': self._date_to_text(),
             'author': self.author,
-            'topics': self.topics
+            'topics': self.topics,
+            'source': self.text_source
         }
 
     def _date_to_text(self):
@@ -0,0 +1,110 @@
+"""
+Content-addressed blob store implementation
+"""
+import hashlib
+import os
+from pathlib import Path
+import threading
+import time
+
+from core_utils.file_stats import get_mtime, get_size
+
+
+class BlobStore:
+    """
+    Content-addressed blob store implementation.
+    Keeps each distinct PDF once under its SHA-256 hash together with texts extracted from it.
+    Entries not used for max_age seconds are dropped,
+    least recently used ones are dropped when the store outgrows max_size bytes
+    """
+    def __init__(self, root: Path, max_size: int, max_age: float):
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._size = sum(get_size(path) for path in self._iter_entries())
+        with self._lock:
+            self._evict()
+
+    def _iter_entries(self):
+        """
+        Yields stored files except the ones other crawler processes are still writing
+        """
+        return (path for path in self._root.glob('*/*') if path.suffix != '.tmp')
+
+    def _get_blob_path(self, digest: str) -> Path:
+        return self._root / digest[:2] / f'{digest}.pdf'
+
+    def _get_text_path(self, digest: str, stop_marker: str = None) -> Path:
+        marker_key = hashlib.sha256((stop_marker or '').encode('utf-8')).hexdigest()[:8]
+        return self._root / digest[:2] / f'{digest}_{marker_key}.txt'
+
+    def put(self, content: bytes) -> str:
+        """
+        Stores the blob unless it is already known and returns its hash
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._get_blob_path(digest)
+        with self._lock:
+            try:
+                os.utime(blob_path)
+            except FileNotFoundError:
+                self._write(blob_path, content)
+                if self._size > self._max_size:
+                    self._evict()
+        return digest
+
+    def get(self, digest: str):
+        """
+        Returns the blob, None if it is not known
+        """
+        blob_path = self._get_blob_path(digest)
+        with self._lock:
+            try:
+                os.utime(blob_path)
+                return blob_path.read_bytes()
+            except FileNotFoundError:
+                return None
+
+    def get_text(self, digest: str, stop_marker: str = None):
+        """
+        Returns text extracted earlier from the blob, None if the text is not known
+        """
+        text_path = self._get_text_path(digest, stop_marker)
+        with self._lock:
+            try:
+                os.utime(text_path)
+                return text_path.read_text(encoding='utf-8')
+            except FileNotFoundError:
+                return None
+
+    def put_text(self, digest: str, text: str, stop_marker: str = None):
+        """
+        Stores text extracted from the blob
+        """
+        with self._lock:
+            self._write(self._get_text_path(digest, stop_marker), text.encode('utf-8'))
+            if self._size > self._max_size:
+                self._evict()
+
+    def _write(self, path: Path, content: bytes):
+        path.parent.mkdir(exist_ok=True)
+        self._size -= get_size(path)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        self._size += len(content)
+
+    def _evict(self):
+        """
+        Removes expired entries, then least recently used ones until the store fits max_size.
+        Entries removed by another crawler process meanwhile are skipped
+        """
+        expiration_time = time.time() - self._max_age
+        entries = sorted(((get_mtime(path), path) for path in self._iter_entries()), key=lambda entry: entry[0])
+        for mtime, path in entries:
+            if mtime >= expiration_time and self._size <= self._max_size:
+                break
+            self._size -= get_size(path)
+            path.unlink(missing_ok=True)
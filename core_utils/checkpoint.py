@@ -0,0 +1,80 @@
+"""
+Crawl checkpoint implementation
+"""
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+
+class CrawlCheckpoint:
+    """
+    Crawl checkpoint implementation.
+    Periodically writes URLs found by the crawler, their known galley links and metadata
+    and the URLs the frontier still has to process, including the ones being parsed,
+    to a small state file, so that a crawl that died continues where it stopped
+    """
+    def __init__(self, path: Path, interval: float = 30.0):
+        self._path = Path(path)
+        self._interval = interval
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def save_if_due(self, crawler):
+        """
+        Saves crawler state unless it was saved less than interval seconds ago
+        """
+        with self._lock:
+            if time.monotonic() - self._saved_at < self._interval:
+                return
+        self.save(crawler)
+
+    def save(self, crawler):
+        """
+        Writes crawler state to disk
+        """
+        discovered = {}
+        for url, info in dict(crawler.discovered).items():
+            discovered[url] = dict(info)
+            if 'meta' in info:
+                meta = info['meta']
+                discovered[url]['meta'] = dict(meta, date=meta['date'].isoformat() if meta['date'] else None)
+        state = {
+            'urls': list(crawler.urls),
+            'discovered': discovered,
+            'frontier': crawler.frontier.get_entries()
+        }
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix('.tmp')
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
+            self._saved_at = time.monotonic()
+
+    def restore(self, crawler) -> bool:
+        """
+        Loads crawler state saved by the previous run, returns False if there is none
+        """
+        if not self._path.exists():
+            return False
+        with open(self._path, encoding='utf-8') as file:
+            state = json.load(file)
+        crawler.urls = state['urls']
+        for url, info in state.get('discovered', {}).items():
+            if 'meta' in info:
+                meta = info['meta']
+                info['meta'] = dict(meta, date=datetime.fromisoformat(meta['date']) if meta['date'] else None)
+            crawler.discovered[url] = info
+        crawler.frontier.restore(state['frontier'])
+        return True
+
+    def clear(self):
+        """
+        Removes saved state
+        """
+        with self._lock:
+            if self._path.exists():
+                self._path.unlink()
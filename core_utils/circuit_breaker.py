@@ -0,0 +1,73 @@
+"""
+Circuit breaker implementation
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+FAILURE_STATUSES = (500, 502, 503, 504)
+MIN_RETRY_AFTER = 1.0
+
+
+class CircuitOpenError(Exception):
+    """
+    Requests to the host are suspended after repeated failures,
+    retry_after tells in how many seconds the host may be tried again
+    """
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f'requests to {host} are suspended')
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+    After threshold failures in a row requests to the host fail immediately
+    for cooldown seconds, then a single trial request decides
+    whether the host is back or stays suspended for another cooldown
+    """
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = {}
+        self._opened_until = {}
+        self._trial_hosts = set()
+        self._lock = threading.Lock()
+
+    def before_request(self, url: str):
+        """
+        Raises CircuitOpenError while requests to the host of the given URL are suspended
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            opened_until = self._opened_until.get(host)
+            if opened_until is None:
+                return
+            now = time.monotonic()
+            if now < opened_until or host in self._trial_hosts:
+                raise CircuitOpenError(host, max(opened_until - now, MIN_RETRY_AFTER))
+            self._trial_hosts.add(host)
+
+    def after_response(self, url: str, response):
+        """
+        Counts server errors as failures, any other response closes the circuit
+        """
+        if response.status_code in FAILURE_STATUSES:
+            self.after_error(url, None)
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_until.pop(host, None)
+            self._trial_hosts.discard(host)
+
+    def after_error(self, url: str, error):  # pylint: disable=unused-argument
+        """
+        Counts the failure and opens the circuit once the host fails too often
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if host in self._trial_hosts or self._failures[host] >= self._threshold:
+                self._opened_until[host] = time.monotonic() + self._cooldown
+                self._trial_hosts.discard(host)
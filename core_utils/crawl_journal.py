@@ -0,0 +1,125 @@
+"""
+Crawl journal implementation
+"""
+import json
+import os
+from pathlib import Path
+import threading
+
+from constants import ASSETS_PATH
+
+
+class CrawlJournal:
+    """
+    Crawl journal implementation.
+    Remembers which article id and content hash every crawled URL got,
+    so that incremental crawls skip unchanged articles and continue numeration.
+    Hands out ids to concurrent parser workers, ids that are not recorded
+    (for example, reserved by a crawl that died) are free and taken first
+    """
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._entries = {}
+        if self._path.exists():
+            with open(self._path, encoding='utf-8') as file:
+                self._entries = json.load(file)
+        self._lock = threading.Lock()
+        self._next_id = None
+        self._released_ids = []
+
+    def get_article_id(self, url: str):
+        """
+        Returns id given to the URL during previous crawls, None for new URLs
+        """
+        entry = self._entries.get(url)
+        return entry['id'] if entry else None
+
+    def get_next_article_id(self) -> int:
+        """
+        Returns id that continues numeration of already collected articles
+        """
+        return max((entry['id'] for entry in self._entries.values()), default=0) + 1
+
+    def reserve_article_id(self, url: str) -> int:
+        """
+        Returns id for the URL: the known one or the lowest id not taken yet
+        """
+        with self._lock:
+            known_id = self.get_article_id(url)
+            if known_id:
+                return known_id
+            if self._next_id is None:
+                self._next_id = self.get_next_article_id()
+                self._released_ids = sorted(set(self._released_ids) | set(self._get_missing_ids()))
+            if self._released_ids:
+                self._released_ids.sort()
+                return self._released_ids.pop(0)
+            self._next_id += 1
+            return self._next_id - 1
+
+    def release_article_id(self, url: str, article_id: int):
+        """
+        Returns id reserved for a new URL that was not collected
+        """
+        with self._lock:
+            if self.get_article_id(url) is None:
+                self._released_ids.append(article_id)
+
+    def _get_missing_ids(self) -> list:
+        """
+        Returns ids below the highest recorded one that no article has
+        """
+        recorded_ids = {entry['id'] for entry in self._entries.values()}
+        return sorted(set(range(1, max(recorded_ids, default=0) + 1)) - recorded_ids)
+
+    def compact(self):
+        """
+        Fills gaps left by released and never recorded ids with the articles that have the highest ids.
+        Returns list of (old_id, new_id) pairs of moved articles.
+        Must be called only when no worker is collecting articles
+        """
+        moves = []
+        with self._lock:
+            for free_id in sorted(set(self._released_ids) | set(self._get_missing_ids())):
+                last_entry = max(self._entries.values(), key=lambda entry: entry['id'], default=None)
+                if last_entry is None or last_entry['id'] < free_id:
+                    break
+                moves.append((last_entry['id'], free_id))
+                last_entry['id'] = free_id
+            self._released_ids = []
+            self._next_id = None
+        return moves
+
+    def is_unchanged(self, url: str, content_hash: str) -> bool:
+        """
+        Checks that the article is already collected and its page has not changed since
+        """
+        entry = self._entries.get(url)
+        if not entry or entry['hash'] != content_hash:
+            return False
+        return (ASSETS_PATH / f"{entry['id']}_raw.txt").exists()
+
+    def record(self, url: str, article_id: int, content_hash: str):
+        """
+        Remembers that the URL is collected under the given id
+        """
+        with self._lock:
+            self._entries[url] = {'id': article_id, 'hash': content_hash}
+
+    def clear(self):
+        """
+        Forgets all collected articles
+        """
+        with self._lock:
+            self._entries = {}
+
+    def save(self):
+        """
+        Writes journal to disk
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix('.tmp')
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._entries, file, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
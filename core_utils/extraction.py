@@ -0,0 +1,98 @@
+"""
+Declarative HTML extraction implementation
+"""
+from lxml import etree, html
+
+BLOCK_TAGS = ('p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'blockquote')
+INVISIBLE_TAGS = ('script', 'style', 'noscript')
+
+
+def get_page_text(page, stop_marker: str = None) -> str:
+    """
+    Returns visible text of the page body, block elements start new lines.
+    Text is cut at stop_marker if given
+    """
+    tree = html.fromstring(page)
+    for element in list(tree.iter(*INVISIBLE_TAGS)):
+        element.drop_tree()
+    for element in tree.iter(*BLOCK_TAGS):
+        element.tail = '\n' + (element.tail or '')
+    body = tree.find('body')
+    lines = (line.strip() for line in (tree if body is None else body).text_content().splitlines())
+    text = '\n'.join(line for line in lines if line)
+    if stop_marker and stop_marker in text:
+        text = text[:text.index(stop_marker)]
+    return text.strip()
+
+
+class FieldRule:
+    """
+    Extraction rule of a single page field.
+    Matches elements by tag and classes, the value is taken from the matched element
+    with an XPath expression that is compiled once together with the rule
+    """
+    def __init__(self, tag: str, classes: str = '', value_path: str = 'string(.)', many: bool = False):
+        self.tag = tag
+        self.classes = frozenset(classes.split())
+        self.many = many
+        self._value_path = etree.XPath(value_path)
+
+    def matches(self, element) -> bool:
+        """
+        Checks that the element has all classes of the rule
+        """
+        return self.classes.issubset((element.get('class') or '').split())
+
+    def get_value(self, element):
+        """
+        Returns stripped value of the element, None if it is empty
+        """
+        value = self._value_path(element)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is None:
+            return None
+        return str(value).strip() or None
+
+
+class ExtractionRules:
+    """
+    Set of field rules of a site.
+    All fields are extracted in a single walk over the lxml tree of the page
+    that visits only elements with tags the rules are interested in
+    """
+    def __init__(self, rules: dict):
+        self._rules_by_tag = {}
+        for field, rule in rules.items():
+            self._rules_by_tag.setdefault(rule.tag, []).append((field, rule))
+        self._single_fields = {field for field, rule in rules.items() if not rule.many}
+        self._has_many_fields = len(self._single_fields) < len(rules)
+
+    @classmethod
+    def from_spec(cls, spec: dict):
+        """
+        Compiles rules described as {field: {'tag': ..., 'classes': ..., 'value_path': ..., 'many': ...}}
+        """
+        return cls({field: FieldRule(**rule) for field, rule in spec.items()})
+
+    def extract(self, page: str) -> dict:
+        """
+        Returns values of found fields, values of multiple fields are lists
+        """
+        values = {}
+        found_fields = 0
+        for element in html.fromstring(page).iter(*self._rules_by_tag):
+            for field, rule in self._rules_by_tag[element.tag]:
+                if not rule.many and field in values or not rule.matches(element):
+                    continue
+                value = rule.get_value(element)
+                if value is None:
+                    continue
+                if rule.many:
+                    values.setdefault(field, []).append(value)
+                    continue
+                values[field] = value
+                found_fields += 1
+            if not self._has_many_fields and found_fields == len(self._single_fields):
+                break
+        return values
@@ -0,0 +1,24 @@
+"""
+File stats of caches shared by crawler processes
+"""
+from pathlib import Path
+
+
+def get_size(path: Path) -> int:
+    """
+    Returns size of the file, 0 if another process has already removed it
+    """
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def get_mtime(path: Path) -> float:
+    """
+    Returns modification time of the file, 0 if another process has already removed it
+    """
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
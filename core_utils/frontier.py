@@ -0,0 +1,201 @@
+"""
+Crawl frontier implementation
+"""
+import hashlib
+import heapq
+import itertools
+from pathlib import Path
+import threading
+import time
+
+
+class _URLQueue:
+    """
+    Priority queue of URLs, URLs with fewer attempts and higher priority go first.
+    Deferred URLs are kept aside until they are due
+    """
+    def __init__(self):
+        self._heap = []
+        self._deferred = []
+        self._counter = itertools.count()
+
+    def push(self, url: str, attempts: int, priority: int):
+        """
+        Queues URL
+        """
+        heapq.heappush(self._heap, (attempts, -priority, next(self._counter), url))
+
+    def pop(self):
+        """
+        Returns the first queued URL, None if the queue is empty
+        """
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[-1]
+
+    def defer(self, url: str, delay: float):
+        """
+        Keeps URL aside for delay seconds
+        """
+        heapq.heappush(self._deferred, (time.monotonic() + delay, next(self._counter), url))
+
+    def pop_due(self) -> list:
+        """
+        Returns deferred URLs that are due
+        """
+        now = time.monotonic()
+        due_urls = []
+        while self._deferred and self._deferred[0][0] <= now:
+            due_urls.append(heapq.heappop(self._deferred)[-1])
+        return due_urls
+
+    def get_delay(self):
+        """
+        Returns seconds until the next deferred URL is due, None if no URL is deferred
+        """
+        if not self._deferred:
+            return None
+        return max(self._deferred[0][0] - time.monotonic(), 0.0)
+
+    def clear(self):
+        """
+        Removes queued and deferred URLs
+        """
+        self._heap = []
+        self._deferred = []
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class CrawlFrontier:
+    """
+    Crawl frontier implementation.
+    Hands out URLs in priority order, highest priority first, and accepts every URL once.
+    Fingerprints of processed URLs are appended to a local file,
+    so an interrupted crawl that is started again does not visit them twice.
+    Failed URLs are put back behind fresh ones until they run out of attempts,
+    deferred URLs are held back until their time comes without losing an attempt
+    """
+    def __init__(self, path: Path = None, max_attempts: int = 2):
+        self._path = Path(path) if path else None
+        self._max_attempts = max_attempts
+        self._done = set()
+        if self._path and self._path.exists():
+            self._done = set(self._path.read_text(encoding='utf-8').split())
+        self._seen = set(self._done)
+        self._queue = _URLQueue()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_fingerprint(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+    def _push(self, url: str):
+        entry = self._entries[url]
+        self._queue.push(url, entry['attempts'], entry['priority'])
+
+    def add(self, url: str, priority: int = 0) -> bool:
+        """
+        Queues URL that has not been seen yet, returns False for already seen ones
+        """
+        fingerprint = self._get_fingerprint(url)
+        with self._lock:
+            if fingerprint in self._seen:
+                return False
+            self._seen.add(fingerprint)
+            self._entries[url] = {'priority': priority, 'attempts': 0}
+            self._push(url)
+        return True
+
+    def pop(self):
+        """
+        Returns queued URL with the highest priority, None if the frontier is empty
+        """
+        with self._lock:
+            for url in self._queue.pop_due():
+                if url in self._entries:
+                    self._push(url)
+            return self._queue.pop()
+
+    def defer(self, url: str, delay: float):
+        """
+        Puts URL back to the frontier, it is handed out again in delay seconds
+        """
+        with self._lock:
+            if url in self._entries:
+                self._queue.defer(url, delay)
+
+    def get_delay(self):
+        """
+        Returns seconds until the next deferred URL is due, None if no URL is deferred
+        """
+        with self._lock:
+            return self._queue.get_delay()
+
+    def requeue(self, url: str) -> bool:
+        """
+        Puts failed URL back to the frontier, returns False once its attempts are over
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return False
+            entry['attempts'] += 1
+            if entry['attempts'] >= self._max_attempts:
+                del self._entries[url]
+                return False
+            self._push(url)
+        return True
+
+    def mark_done(self, url: str):
+        """
+        Remembers that the URL is processed and must not be visited by a restarted crawl
+        """
+        fingerprint = self._get_fingerprint(url)
+        with self._lock:
+            self._entries.pop(url, None)
+            if fingerprint in self._done:
+                return
+            self._done.add(fingerprint)
+            if self._path:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._path, 'a', encoding='utf-8') as file:
+                    file.write(fingerprint + '\n')
+
+    def get_entries(self) -> list:
+        """
+        Returns URLs that are queued or being processed together with their priorities and attempts
+        """
+        with self._lock:
+            return [dict(entry, url=url) for url, entry in self._entries.items()]
+
+    def restore(self, entries: list):
+        """
+        Queues URLs saved with get_entries except the ones processed since then
+        """
+        with self._lock:
+            for entry in entries:
+                fingerprint = self._get_fingerprint(entry['url'])
+                if fingerprint in self._done or entry['url'] in self._entries:
+                    continue
+                self._seen.add(fingerprint)
+                self._entries[entry['url']] = {'priority': entry['priority'], 'attempts': entry['attempts']}
+                self._push(entry['url'])
+
+    def clear(self):
+        """
+        Forgets all seen, processed and queued URLs
+        """
+        with self._lock:
+            self._done = set()
+            self._seen = set()
+            self._queue.clear()
+            self._entries = {}
+            if self._path and self._path.exists():
+                self._path.unlink()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue)
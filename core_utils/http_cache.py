@@ -0,0 +1,139 @@
+"""
+On-disk HTTP response cache implementation
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+
+import requests
+
+from core_utils.file_stats import get_mtime, get_size
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache.
+    Stores body and validators (ETag, Last-Modified) of each URL on disk,
+    keeps total size of bodies under max_size evicting least recently used entries.
+    Bodies kept in a blob store are not stored, only their digest is kept with the validators
+    """
+    def __init__(self, root: Path, max_size: int):
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._size = sum(get_size(path) for path in self._root.glob('*.body'))
+
+    def _get_paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self._root / f'{key}.body', self._root / f'{key}.json'
+
+    def _read_meta(self, url: str) -> dict:
+        """
+        Returns validators and headers of the cached entry, an empty dict if there is no entry
+        """
+        _, meta_path = self._get_paths(url)
+        with self._lock:
+            try:
+                with open(meta_path, encoding='utf-8') as file:
+                    return json.load(file)
+            except FileNotFoundError:
+                return {}
+
+    def get_conditional_headers(self, url: str) -> dict:
+        """
+        Returns headers that turn a request for the given URL into a conditional one
+        """
+        meta = self._read_meta(url)
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def get_digest(self, url: str):
+        """
+        Returns digest of the body kept in a blob store, None if the body is not kept there
+        """
+        return self._read_meta(url).get('digest')
+
+    def load(self, url: str, body: bytes = None):
+        """
+        Builds a response from the cached entry, returns None if there is no entry.
+        Body kept in a blob store is given by the caller
+        """
+        body_path, meta_path = self._get_paths(url)
+        with self._lock:
+            try:
+                with open(meta_path, encoding='utf-8') as file:
+                    meta = json.load(file)
+                if body is None:
+                    body = body_path.read_bytes()
+                os.utime(meta_path)
+            except FileNotFoundError:
+                return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers.update(meta['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        # pylint: disable=protected-access
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def store(self, url: str, response, body: bytes = None, digest: str = None):
+        """
+        Saves response body (or the body given) with its validators,
+        only the digest is saved for bodies kept in a blob store.
+        Responses without validators are not cached
+        """
+        body = b'' if digest else response.content if body is None else body
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'digest': digest,
+            'headers': {name: response.headers[name] for name in ('Content-Type',) if name in response.headers}
+        }
+        body_path, meta_path = self._get_paths(url)
+        with self._lock:
+            self._size -= get_size(body_path)
+            # crawler processes share the cache, so files are replaced whole and never seen half-written
+            if digest:
+                body_path.unlink(missing_ok=True)
+            else:
+                tmp_path = body_path.with_name(f'{body_path.name}.{os.getpid()}.tmp')
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, body_path)
+            tmp_path = meta_path.with_name(f'{meta_path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(meta, file)
+            os.replace(tmp_path, meta_path)
+            self._size += len(body)
+            self._evict()
+
+    def _evict(self):
+        """
+        Removes least recently used entries until the cache fits max_size,
+        entries removed by another crawler process meanwhile are skipped
+        """
+        if self._size <= self._max_size:
+            return
+        entries = sorted(self._root.glob('*.json'), key=get_mtime)
+        for meta_path in entries:
+            if self._size <= self._max_size:
+                break
+            body_path = meta_path.with_suffix('.body')
+            self._size -= get_size(body_path)
+            body_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
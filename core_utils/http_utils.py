@@ -0,0 +1,356 @@
+"""
+HTTP client implementation
+"""
+import time
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from core_utils.rate_limiter import THROTTLING_STATUSES, AdaptiveRateLimiter
+from core_utils.response_archive import NotArchivedError
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# sizes and Range offsets of downloads are counted in bytes sent over the wire
+DOWNLOAD_HEADERS = {'Accept-Encoding': 'identity'}
+DECODED_ENCODINGS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+class DownloadTooLargeError(Exception):
+    """
+    Downloaded file exceeds the allowed size
+    """
+
+
+class IncompleteDownloadError(Exception):
+    """
+    Connection closed before the whole file was received
+    """
+
+
+class CrawlDeadlineExceededError(Exception):
+    """
+    Time budget of the crawl is spent
+    """
+
+
+def get_request_url(url: str, params: dict = None) -> str:
+    """
+    Returns URL with the query parameters given
+    """
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class HTTPClient:
+    """
+    HTTP client implementation.
+    Keeps one pooled keep-alive session that is shared
+    by Crawler, HTMLParser and PDFRawFile.
+    When a response cache is given, revalidates cached URLs with conditional requests.
+    When a response archive is given, every successful response is archived with its body.
+    Hooks (e.g. circuit breaker, rate limiter) are notified before every request
+    and after every response or failure, hooks with after_body are also told the size of every body received.
+    Throttled requests are retried with exponential backoff.
+    Once the crawl time budget is spent no more requests are sent,
+    read timeouts never reach past the end of the budget
+    """
+    def __init__(self, options: dict = None, cache=None, hooks=(), archive=None):
+        options = options or {}
+        self._timeout = (options.get('connect_timeout', 5.0), options.get('request_timeout', 30.0))
+        time_budget = options.get('crawl_time_budget', 0)
+        self._deadline = time.monotonic() + time_budget if time_budget else None
+        self._cache = cache
+        self._archive = archive
+        self._hooks = hooks
+        self._session = requests.Session()
+        pool_size = options.get('connection_pool_size', 10)
+        # the same retry policy applies to connection errors, dropped downloads and throttled requests
+        self._retry = Retry(total=options.get('max_retries', 3),
+                            backoff_factor=options.get('backoff_factor', 0.5),
+                            allowed_methods=('GET', 'HEAD'))
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size,
+                              max_retries=self._retry)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def get(self, url: str, **kwargs):
+        """
+        Sends GET request through the pooled session
+        """
+        url = get_request_url(url, kwargs.pop('params', None))
+        if self._cache is None:
+            return self._archive_response(url, self._send(url, **kwargs))
+
+        headers = kwargs.pop('headers', None) or {}
+        conditional_headers = dict(headers, **self._cache.get_conditional_headers(url))
+        response = self._send(url, headers=conditional_headers, **kwargs)
+        if response.status_code == 304:
+            cached_response = self._cache.load(url)
+            if cached_response is not None:
+                return self._archive_response(url, cached_response)
+            response = self._send(url, headers=headers, **kwargs)
+        if response.status_code == 200:
+            self._cache.store(url, response)
+        return self._archive_response(url, response)
+
+    def _archive_response(self, url: str, response, body: bytes = None):
+        """
+        Archives successful response if the archive is given
+        """
+        if self._archive is not None and response.status_code == 200:
+            self._archive.store(url, response, body)
+        return response
+
+    def download(self, url: str, max_size: int = None, blob_store=None) -> bytes:
+        """
+        Downloads file in chunks. A dropped connection is resumed with a Range request
+        from the last received byte, download is aborted as soon as the file exceeds max_size.
+        The file is asked for without content coding, a body the server encodes anyway is decoded at the end.
+        When blob_store is given, the file is kept there and the response cache keeps only its validators,
+        so that an unchanged file is revalidated and read from the blob store
+        """
+        content = bytearray()
+        validators = {} if self._cache is None else self._cache.get_conditional_headers(url)
+        first_response = None
+        attempt = 0
+        while True:
+            headers = self._get_resume_headers(content, first_response) if content else validators
+            headers = dict(DOWNLOAD_HEADERS, **headers)
+            try:
+                with self._send(url, headers=headers, stream=True) as response:
+                    if response.status_code == 304 and not content:
+                        cached_body = self._load_cached_body(url, blob_store)
+                        if cached_body is not None:
+                            return cached_body
+                        validators = {}
+                        continue
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        content.clear()
+                        first_response = response
+                    self._receive(url, response, content, max_size)
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    ProtocolError, ReadTimeoutError, IncompleteDownloadError):
+                attempt += 1
+                if attempt > self._retry.total:
+                    raise
+                time.sleep(self._retry.backoff_factor * 2 ** attempt)
+
+        if first_response is None:
+            return bytes(content)
+        body = self._decode(url, first_response, bytes(content), max_size)
+        self._notify_body(url, len(body))
+        if self._cache is not None and blob_store is not None:
+            self._cache.store(url, first_response, digest=blob_store.put(body))
+        elif self._cache is not None:
+            self._cache.store(url, first_response, body)
+        self._archive_response(url, first_response, body)
+        return body
+
+    def _load_cached_body(self, url: str, blob_store=None):
+        """
+        Returns body of the cached response, the one kept in blob_store is read from there.
+        Returns None if the body is not kept anymore
+        """
+        body = None
+        if blob_store is not None:
+            digest = self._cache.get_digest(url)
+            body = blob_store.get(digest) if digest else None
+            if body is None:
+                return None
+        cached_response = self._cache.load(url, body)
+        if cached_response is None:
+            return None
+        return self._archive_response(url, cached_response).content
+
+    @staticmethod
+    def _decode(url: str, response, content: bytes, max_size: int = None) -> bytes:
+        """
+        Removes content coding the server applied to the body despite being asked not to
+        """
+        encoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+        if encoding == 'identity':
+            return content
+        if encoding not in DECODED_ENCODINGS:
+            raise requests.exceptions.ContentDecodingError(f'{url} is encoded with {encoding}')
+        decompressor = zlib.decompressobj(DECODED_ENCODINGS[encoding])
+        body = decompressor.decompress(content, max_size + 1 if max_size else 0)
+        if max_size and len(body) > max_size:
+            raise DownloadTooLargeError(f'{url} exceeds {max_size} bytes')
+        return body
+
+    @staticmethod
+    def _get_resume_headers(content: bytearray, first_response) -> dict:
+        """
+        Returns headers asking for the rest of the file that is partially received
+        """
+        headers = {'Range': f'bytes={len(content)}-'}
+        if first_response is not None and first_response.headers.get('ETag'):
+            headers['If-Range'] = first_response.headers['ETag']
+        return headers
+
+    def _receive(self, url: str, response, content: bytearray, max_size: int = None):
+        """
+        Appends response body to the content received so far checking its size.
+        The body is not decoded, so its size matches Content-Length and Range offsets
+        """
+        expected_size = self._get_expected_size(response, len(content))
+        if max_size and expected_size and expected_size > max_size:
+            raise DownloadTooLargeError(f'{url} is {expected_size} bytes')
+        for chunk in response.raw.stream(DOWNLOAD_CHUNK_SIZE, decode_content=False):
+            self._get_remaining_time()  # raises once the deadline has passed
+            content.extend(chunk)
+            if max_size and len(content) > max_size:
+                raise DownloadTooLargeError(f'{url} exceeds {max_size} bytes')
+        if expected_size and len(content) != expected_size:
+            raise IncompleteDownloadError(f'{url}: {len(content)} of {expected_size} bytes received')
+
+    @staticmethod
+    def _get_expected_size(response, received: int):
+        """
+        Returns full size of the file being downloaded, None if the server does not tell it
+        """
+        content_range = response.headers.get('Content-Range', '')
+        if response.status_code == 206 and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            return int(total) if total.isdigit() else None
+        content_length = response.headers.get('Content-Length', '')
+        return received + int(content_length) if content_length.isdigit() else None
+
+    def is_expired(self) -> bool:
+        """
+        Checks that the crawl time budget is spent
+        """
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _get_remaining_time(self):
+        """
+        Returns seconds left until the crawl deadline, None if there is no deadline
+        """
+        if self._deadline is None:
+            return None
+        remaining_time = self._deadline - time.monotonic()
+        if remaining_time <= 0:
+            raise CrawlDeadlineExceededError('crawl time budget is spent')
+        return remaining_time
+
+    def _get_timeout(self) -> tuple:
+        """
+        Returns connect and read timeouts cut to the time left until the crawl deadline
+        """
+        remaining_time = self._get_remaining_time()
+        if remaining_time is None:
+            return self._timeout
+        return tuple(min(timeout, remaining_time) for timeout in self._timeout)
+
+    def _send(self, url: str, **kwargs):
+        """
+        Sends request notifying hooks, retries throttled requests
+        """
+        attempt = 0
+        while True:
+            kwargs['timeout'] = self._get_timeout()
+            for hook in self._hooks:
+                hook.before_request(url)
+            try:
+                response = self._session.get(url, **kwargs)
+            except requests.RequestException as error:
+                for hook in self._hooks:
+                    hook.after_error(url, error)
+                raise
+            for hook in self._hooks:
+                hook.after_response(url, response)
+            if not kwargs.get('stream'):
+                self._notify_body(url, len(response.content))
+            if response.status_code not in THROTTLING_STATUSES or attempt >= self._retry.total:
+                return response
+            response.close()
+            backoff = self._get_backoff(response, attempt)
+            remaining_time = self._get_remaining_time()
+            if remaining_time is not None and backoff >= remaining_time:
+                return response
+            time.sleep(backoff)
+            attempt += 1
+
+    def _notify_body(self, url: str, size: int):
+        """
+        Tells hooks interested in body sizes how many bytes were received
+        """
+        for hook in self._hooks:
+            if hasattr(hook, 'after_body'):
+                hook.after_body(url, size)
+
+    def _get_backoff(self, response, attempt: int) -> float:
+        """
+        Returns time to wait before retrying: Retry-After header if given, exponential backoff otherwise
+        """
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self._retry.backoff_factor * 2 ** attempt
+
+    def close(self):
+        """
+        Closes all pooled connections
+        """
+        self._session.close()
+
+
+class ArchiveClient:
+    """
+    HTTP client that serves responses from the response archive
+    and never goes to the network, used to re-parse archived crawls offline
+    """
+    def __init__(self, archive):
+        self._archive = archive
+
+    def get(self, url: str, **kwargs):
+        """
+        Returns archived response for the URL
+        """
+        url = get_request_url(url, kwargs.get('params'))
+        response = self._archive.load(url)
+        if response is None:
+            raise NotArchivedError(url)
+        return response
+
+    def download(self, url: str, max_size: int = None,  # pylint: disable=unused-argument
+                 blob_store=None) -> bytes:
+        """
+        Returns archived file
+        """
+        content = self.get(url).content
+        if max_size and len(content) > max_size:
+            raise DownloadTooLargeError(f'{url} exceeds {max_size} bytes')
+        return content
+
+    @staticmethod
+    def is_expired() -> bool:
+        """
+        Archive is read without time budget
+        """
+        return False
+
+    def close(self):
+        """
+        Nothing to close, kept for compatibility with HTTPClient
+        """
+
+
+_DEFAULT_CLIENT = None
+
+
+def get_default_client():
+    """
+    Returns HTTP client shared by all components that were not given their own
+    """
+    global _DEFAULT_CLIENT  # pylint: disable=global-statement
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = HTTPClient(hooks=(AdaptiveRateLimiter(),))
+    return _DEFAULT_CLIENT
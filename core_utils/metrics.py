@@ -0,0 +1,157 @@
+"""
+Crawl metrics implementation
+"""
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import threading
+import time
+
+from core_utils.rate_limiter import THROTTLING_STATUSES
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class CrawlMetrics:
+    """
+    Crawl metrics implementation.
+    As an HTTP client hook records latency, size, status and attempt of every request,
+    measures time spent in crawl stages (discovery, HTML parse, PDF download, ...).
+    Every event is appended to a JSONL trace if it is started,
+    totals are summarized in Prometheus text format
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._trace_file = None
+        self._statuses = {}
+        self._latencies = []
+        self._counters = {'errors': 0, 'retries': 0, 'response_bytes': 0}
+        self._stages = {}
+
+    def start_trace(self, path: Path):
+        """
+        Starts writing events to the JSONL trace file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._trace_file = open(path, 'w', encoding='utf-8')
+
+    def stop_trace(self):
+        """
+        Closes the trace file
+        """
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+    def _write_event(self, event: dict):
+        if self._trace_file is not None:
+            self._trace_file.write(json.dumps(dict(event, time=time.time()), ensure_ascii=False) + '\n')
+
+    def before_request(self, url: str):
+        """
+        Starts timing the request, a request for the URL that has just failed is counted as a retry
+        """
+        retried = getattr(self._local, 'failed_url', None) == url
+        self._local.attempt = self._local.attempt + 1 if retried else 0
+        self._local.failed_url = None
+        self._local.started = time.monotonic()
+        if retried:
+            with self._lock:
+                self._counters['retries'] += 1
+
+    def after_response(self, url: str, response):
+        """
+        Records latency and status of the response
+        """
+        latency = time.monotonic() - self._local.started
+        if response.status_code in THROTTLING_STATUSES:
+            self._local.failed_url = url
+        with self._lock:
+            self._statuses[response.status_code] = self._statuses.get(response.status_code, 0) + 1
+            self._latencies.append(latency)
+            self._write_event({'type': 'request', 'url': url, 'status': response.status_code,
+                               'latency': round(latency, 4), 'attempt': self._local.attempt})
+
+    def after_body(self, url: str, size: int):
+        """
+        Records size of the received body, whatever its transfer and content coding was
+        """
+        with self._lock:
+            self._counters['response_bytes'] += size
+            self._write_event({'type': 'body', 'url': url, 'bytes': size})
+
+    def after_error(self, url: str, error):
+        """
+        Records failed request
+        """
+        latency = time.monotonic() - self._local.started
+        self._local.failed_url = url
+        with self._lock:
+            self._counters['errors'] += 1
+            self._write_event({'type': 'request', 'url': url, 'error': type(error).__name__,
+                               'latency': round(latency, 4), 'attempt': self._local.attempt})
+
+    @contextmanager
+    def measure(self, stage: str, url: str = None):
+        """
+        Measures time spent in the stage
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.monotonic() - started, url)
+
+    def record_stage(self, stage: str, duration: float, url: str = None):
+        """
+        Records time spent in the stage that is measured by the caller
+        """
+        with self._lock:
+            total, count = self._stages.get(stage, (0.0, 0))
+            self._stages[stage] = (total + duration, count + 1)
+            self._write_event({'type': 'stage', 'stage': stage, 'url': url, 'duration': round(duration, 4)})
+
+    def get_summary(self) -> str:
+        """
+        Returns collected totals in Prometheus text format
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            lines = ['# TYPE scrapper_http_requests_total counter']
+            lines.extend(f'scrapper_http_requests_total{{status="{status}"}} {count}'
+                         for status, count in sorted(self._statuses.items()))
+            for name, count in self._counters.items():
+                lines.extend([f'# TYPE scrapper_http_{name}_total counter', f'scrapper_http_{name}_total {count}'])
+            lines.append('# TYPE scrapper_http_request_duration_seconds summary')
+            for quantile in QUANTILES:
+                value = latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] if latencies else 0
+                lines.append(f'scrapper_http_request_duration_seconds{{quantile="{quantile}"}} {value:.4f}')
+            lines.extend([f'scrapper_http_request_duration_seconds_sum {sum(latencies):.4f}',
+                          f'scrapper_http_request_duration_seconds_count {len(latencies)}',
+                          '# TYPE scrapper_stage_duration_seconds summary'])
+            for stage, (total, count) in sorted(self._stages.items()):
+                lines.append(f'scrapper_stage_duration_seconds_sum{{stage="{stage}"}} {total:.4f}')
+                lines.append(f'scrapper_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def save_summary(self, path: Path):
+        """
+        Writes summary to the file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.get_summary(), encoding='utf-8')
+
+
+_METRICS = CrawlMetrics()
+
+
+def get_metrics() -> CrawlMetrics:
+    """
+    Returns metrics shared by all crawling components
+    """
+    return _METRICS
@@ -0,0 +1,77 @@
+"""
+OAI-PMH harvester implementation
+"""
+from datetime import datetime
+
+from lxml import etree
+
+NAMESPACES = {
+    'oai': 'http://www.openarchives.org/OAI/2.0/',
+    'oai_dc': 'http://www.openarchives.org/OAI/2.0/oai_dc/',
+    'dc': 'http://purl.org/dc/elements/1.1/'
+}
+
+
+class OAIHarvester:
+    """
+    OAI-PMH harvester implementation.
+    Pages through ListRecords responses of an OJS journal
+    and turns Dublin Core records into article metadata
+    """
+    def __init__(self, endpoint: str, http_client):
+        self._endpoint = endpoint
+        self._http_client = http_client
+
+    def iter_records(self):
+        """
+        Yields metadata of every article the endpoint exposes
+        """
+        params = {'verb': 'ListRecords', 'metadataPrefix': 'oai_dc'}
+        while True:
+            response = self._http_client.get(self._endpoint, params=params)
+            response.raise_for_status()
+            tree = etree.fromstring(response.content)
+
+            for record in tree.iterfind('.//oai:record', NAMESPACES):
+                header = record.find('oai:header', NAMESPACES)
+                if header is not None and header.get('status') == 'deleted':
+                    continue
+                meta = self._parse_record(record)
+                if meta['url']:
+                    yield meta
+
+            token = tree.findtext('.//oai:resumptionToken', namespaces=NAMESPACES)
+            if not token:
+                return
+            params = {'verb': 'ListRecords', 'resumptionToken': token.strip()}
+
+    @staticmethod
+    def _parse_record(record):
+        """
+        Extracts article URL, title, author, topics and date from a Dublin Core record
+        """
+        def texts(tag):
+            return [element.text.strip() for element in record.iterfind(f'.//dc:{tag}', NAMESPACES)
+                    if element.text and element.text.strip()]
+
+        urls = [identifier for identifier in texts('identifier') if '/article/view/' in identifier]
+        titles = texts('title')
+        creators = texts('creator')
+        dates = texts('date')
+
+        author = 'NOT FOUND'
+        if creators:
+            # OJS writes creators as "Last, First Middle", article pages show "First Middle Last"
+            author = ' '.join(reversed(creators[0].split(', ', 1)))
+
+        topics = []
+        for subject in texts('subject'):
+            topics.extend(topic.strip() for topic in subject.split(';') if topic.strip())
+
+        return {
+            'url': urls[0] if urls else None,
+            'title': titles[0] if titles else 'NOT FOUND',
+            'author': author,
+            'topics': topics,
+            'date': datetime.strptime(dates[0][:10], '%Y-%m-%d') if dates else None
+        }
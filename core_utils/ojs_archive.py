@@ -0,0 +1,47 @@
+"""
+OJS issue archive traversal implementation
+"""
+from bs4 import BeautifulSoup
+
+
+class IssueArchive:
+    """
+    OJS issue archive implementation.
+    Pages through the issue archive of a journal, newest issues first,
+    and collects links to every issue it lists
+    """
+    def __init__(self, archive_url: str, http_client):
+        self._archive_url = archive_url.rstrip('/')
+        self._http_client = http_client
+
+    def iter_issue_urls(self):
+        """
+        Yields URL of every issue listed in the archive
+        """
+        seen_urls = set()
+        page_url = self._archive_url
+        while page_url:
+            response = self._http_client.get(page_url)
+            response.raise_for_status()
+            archive_bs = BeautifulSoup(response.text, 'lxml')
+
+            new_urls = [url for url in self._find_issue_urls(archive_bs) if url not in seen_urls]
+            if not new_urls:
+                return
+            seen_urls.update(new_urls)
+            yield from new_urls
+
+            next_link_bs = archive_bs.select_one('.cmp_pagination a.next')
+            page_url = next_link_bs['href'] if next_link_bs else None
+
+    @staticmethod
+    def _find_issue_urls(archive_bs):
+        """
+        Finds issue links on an archive page
+        """
+        issue_urls = []
+        for summary_bs in archive_bs.find_all('div', class_='obj_issue_summary'):
+            link_bs = summary_bs.find('a', class_='title') or summary_bs.find('a', class_='cover')
+            if link_bs and link_bs.get('href') and link_bs['href'] not in issue_urls:
+                issue_urls.append(link_bs['href'])
+        return issue_urls
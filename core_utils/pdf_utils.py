@@ -1,12 +1,92 @@
 """
 PDF files downloader implementation
 """
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
 
-
-import wget
 import fitz
 
-from constants import ASSETS_PATH
+from constants import ASSETS_PATH, BLOB_STORE_PATH
+from core_utils.blob_store import BlobStore
+from core_utils.http_utils import get_default_client
+
+_EXTRACTION_POOL = None
+_EXTRACTION_POOL_LOCK = threading.Lock()
+_BLOB_STORE = None
+_BLOB_STORE_LOCK = threading.Lock()
+
+
+class CorruptedPDFError(Exception):
+    """
+    Downloaded file is not a complete PDF document
+    """
+
+
+def is_complete_pdf(content: bytes) -> bool:
+    """
+    Checks that content starts with PDF header and ends with end-of-file marker
+    """
+    return content.startswith(b'%PDF-') and b'%%EOF' in content[-1024:]
+
+
+def iter_pages_text(content: bytes, stop_marker: str = None):
+    """
+    Yields text of the PDF given as bytes page by page.
+    Stops at the page where stop_marker appears yielding only the text before the marker
+    """
+    with fitz.open(stream=content, filetype='pdf') as pdf:
+        for page in pdf:
+            page_text = page.get_text()
+            if stop_marker and stop_marker in page_text:
+                yield page_text.split(stop_marker)[0]
+                return
+            yield page_text
+
+
+def extract_text(content: bytes, stop_marker: str = None) -> str:
+    """
+    Extracts text of the PDF given as bytes up to stop_marker
+    """
+    return "".join(iter_pages_text(content, stop_marker))
+
+
+def get_extraction_pool(workers: int):
+    """
+    Returns process pool shared by all PDF files for text extraction
+    """
+    global _EXTRACTION_POOL  # pylint: disable=global-statement
+    with _EXTRACTION_POOL_LOCK:
+        if _EXTRACTION_POOL is None:
+            _EXTRACTION_POOL = ProcessPoolExecutor(max_workers=workers,
+                                                   mp_context=multiprocessing.get_context('spawn'))
+        return _EXTRACTION_POOL
+
+
+def get_blob_store(options: dict):
+    """
+    Returns blob store shared by all PDF files, None if it is turned off in options
+    """
+    global _BLOB_STORE  # pylint: disable=global-statement
+    if not options.get('use_blob_store', False):
+        return None
+    with _BLOB_STORE_LOCK:
+        if _BLOB_STORE is None:
+            _BLOB_STORE = BlobStore(BLOB_STORE_PATH,
+                                    max_size=options.get('blob_store_max_size_mb', 1024) * 1024 * 1024,
+                                    max_age=options.get('blob_store_max_age_days', 30) * 24 * 60 * 60)
+        return _BLOB_STORE
+
+
+def shutdown_extraction_pool():
+    """
+    Stops text extraction processes
+    """
+    global _EXTRACTION_POOL  # pylint: disable=global-statement
+    with _EXTRACTION_POOL_LOCK:
+        if _EXTRACTION_POOL is not None:
+            _EXTRACTION_POOL.shutdown()
+            _EXTRACTION_POOL = None
 
 
 class PDFRawFile:
@@ -14,28 +94,79 @@ class PDFRawFile:
     PDF files downloader class implementation.
     Knows how to download PDF from a given URL.
     Manages PDF's text.
+    Keeps PDF in memory, saves it to ASSETS_PATH only if persist_pdfs option is set.
+    Extracts text in a shared process pool of pdf_extraction_workers processes,
+    in the calling thread if the option is 0.
+    With use_blob_store option set, the PDF is kept on disk once, in the blob store,
+    the HTTP response cache keeps only its validators, so unchanged PDFs are revalidated and read from the blob store.
+    Texts of already known PDFs are taken from the blob store.
     """
-    def __init__(self, journal_url: str, journal_id: int):
+    def __init__(self, journal_url: str, journal_id: int, http_client=None, options: dict = None):
         self._url = journal_url
         self._id = journal_id
         self.text = None
+        self._http_client = http_client or get_default_client()
+        self._options = options or {}
+        self._content = None
 
     def download(self):
         """
         Downloads PDF file by the URL given.
+        Files larger than max_pdf_size_mb are rejected,
+        incomplete files are downloaded once again before giving up.
         """
-        wget.download(self._url, str(ASSETS_PATH / f"{self._id}_raw.pdf"))
+        max_size = self._options.get('max_pdf_size_mb', 50) * 1024 * 1024
+        blob_store = get_blob_store(self._options)
+        for _ in range(2):
+            self._content = self._http_client.download(self._url, max_size, blob_store)
+            if is_complete_pdf(self._content):
+                break
+        else:
+            raise CorruptedPDFError(self._url)
+        if self._options.get('persist_pdfs', False):
+            with open(self.get_file_path(), 'wb') as file:
+                file.write(self._content)
 
-    def get_text(self):
+    def get_text(self, stop_marker: str = None):
         """
         Gets text from the PDF file downloaded.
+        Extraction stops as soon as stop_marker is found, the marker and the rest are not included
         """
-        text = ""
-        with fitz.open(ASSETS_PATH / f"{self._id}_raw.pdf") as pdf:
-            for page in pdf:
-                text += page.get_text()
+        content = self._get_content()
+        blob_store = get_blob_store(self._options)
+        if blob_store is not None:
+            digest = blob_store.put(content)
+            text = blob_store.get_text(digest, stop_marker)
+            if text is not None:
+                return text
+
+        workers = self._options.get('pdf_extraction_workers', 0)
+        if workers:
+            text = get_extraction_pool(workers).submit(extract_text, content, stop_marker).result()
+        else:
+            text = extract_text(content, stop_marker)
+
+        if blob_store is not None:
+            blob_store.put_text(digest, text, stop_marker)
         return text
 
+    def iter_pages_text(self, stop_marker: str = None):
+        """
+        Yields text of the PDF file downloaded page by page up to stop_marker
+        """
+        return iter_pages_text(self._get_content(), stop_marker)
+
+    def _get_content(self):
+        if self._content is not None:
+            return self._content
+        return self.get_file_path().read_bytes()
+
+    def get_file_path(self):
+        """
+        Returns path for the PDF file saved
+        """
+        return ASSETS_PATH / f"{self._id}_raw.pdf"
+
     @property
     def own_id(self):
         return self._id
@@ -0,0 +1,109 @@
+"""
+Adaptive rate limiter implementation
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+THROTTLING_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Token bucket implementation.
+    Refills with the given rate and lets at most capacity requests go at once
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, waits until it is available
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _strip_scheme(url: str) -> str:
+    parsed_url = urlparse(url)
+    return parsed_url.netloc + parsed_url.path
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-site adaptive rate limiter.
+    Each site configured with its own limits gets its own token bucket,
+    so several journals on the same host do not share one.
+    URLs of other sites get a bucket per host with the default limits.
+    Bucket rate grows additively while the site responds well and halves on throttling or server errors
+    """
+    def __init__(self, rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 8.0, burst: int = 2):
+        self._default_limits = (rate, min_rate, max_rate, burst)
+        self._site_limits = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def configure_site(self, site_url: str, limits: tuple):
+        """
+        Sets own limits (rate, min_rate, max_rate, burst) for URLs starting with site_url
+        """
+        with self._lock:
+            self._site_limits[_strip_scheme(site_url)] = limits
+
+    def _get_key(self, url: str) -> str:
+        """
+        Returns the longest configured site the URL belongs to, its host if there is none
+        """
+        url = _strip_scheme(url)
+        sites = [site for site in self._site_limits if url.startswith(site)]
+        return max(sites, key=len) if sites else urlparse(f'//{url}').netloc
+
+    def _get_limits(self, key: str) -> tuple:
+        return self._site_limits.get(key, self._default_limits)
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        with self._lock:
+            key = self._get_key(url)
+            if key not in self._buckets:
+                rate, _, _, burst = self._get_limits(key)
+                self._buckets[key] = TokenBucket(rate, burst)
+            return self._buckets[key]
+
+    def before_request(self, url: str):
+        """
+        Waits until a request to the host of the given URL is allowed
+        """
+        self._get_bucket(url).acquire()
+
+    def after_response(self, url: str, response):
+        """
+        Adapts the host rate to the response status
+        """
+        bucket = self._get_bucket(url)
+        with self._lock:
+            _, min_rate, max_rate, _ = self._get_limits(self._get_key(url))
+            if response.status_code in THROTTLING_STATUSES:
+                bucket.rate = max(min_rate, bucket.rate / 2)
+            else:
+                bucket.rate = min(max_rate, bucket.rate + min_rate)
+
+    def after_error(self, url: str, error):  # pylint: disable=unused-argument
+        """
+        Slows down requests to the host that failed to respond
+        """
+        bucket = self._get_bucket(url)
+        with self._lock:
+            _, min_rate, _, _ = self._get_limits(self._get_key(url))
+            bucket.rate = max(min_rate, bucket.rate / 2)
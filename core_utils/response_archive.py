@@ -0,0 +1,111 @@
+"""
+Raw HTTP response archive implementation
+"""
+from datetime import datetime, timezone
+import gzip
+from pathlib import Path
+import threading
+
+import requests
+
+SKIPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class NotArchivedError(Exception):
+    """
+    Response for the URL is not found in the archive
+    """
+
+
+class ResponseArchive:
+    """
+    WARC-style raw response archive.
+    Every response is appended as a separate gzip member with a WARC record header
+    to the archive file of the current crawl, archive files are never rewritten.
+    A CDX-like index next to each file keeps URL, offset and length of every record,
+    the latest record of a URL wins
+    """
+    def __init__(self, root: Path):
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._path = None
+        self._index = None
+
+    def _get_index(self) -> dict:
+        if self._index is None:
+            self._index = {}
+            for index_path in sorted(self._root.glob('*.cdx')):
+                archive_path = index_path.with_suffix('.warc.gz')
+                with open(index_path, encoding='utf-8') as file:
+                    for line in file:
+                        url, offset, length = line.rsplit(' ', 2)
+                        self._index[url] = (archive_path, int(offset), int(length))
+        return self._index
+
+    @staticmethod
+    def _build_record(url: str, response, body: bytes) -> bytes:
+        """
+        Returns gzip member with WARC record of the response
+        """
+        http_head = [f'HTTP/1.1 {response.status_code} {response.reason or ""}'.strip()]
+        http_head.extend(f'{name}: {value}' for name, value in response.headers.items()
+                         if name.lower() not in SKIPPED_HEADERS)
+        block = '\r\n'.join(http_head).encode('utf-8') + b'\r\n\r\n' + body
+        warc_head = ['WARC/1.0',
+                     'WARC-Type: response',
+                     f'WARC-Target-URI: {url}',
+                     f'WARC-Date: {datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}',
+                     'Content-Type: application/http; msgtype=response',
+                     f'Content-Length: {len(block)}']
+        return gzip.compress('\r\n'.join(warc_head).encode('utf-8') + b'\r\n\r\n' + block + b'\r\n\r\n')
+
+    def store(self, url: str, response, body: bytes = None):
+        """
+        Appends response with its body (or the body given) to the archive
+        """
+        record = self._build_record(url, response, response.content if body is None else body)
+        with self._lock:
+            if self._path is None:
+                self._path = self._root / f'responses-{datetime.now():%Y%m%d%H%M%S%f}.warc.gz'
+            with open(self._path, 'ab') as file:
+                offset = file.tell()
+                file.write(record)
+            with open(self._path.with_suffix('').with_suffix('.cdx'), 'a', encoding='utf-8') as file:
+                file.write(f'{url} {offset} {len(record)}\n')
+            if self._index is not None:
+                self._index[url] = (self._path, offset, len(record))
+
+    def load(self, url: str):
+        """
+        Builds a response from the latest archived record of the URL, returns None if there is none
+        """
+        with self._lock:
+            location = self._get_index().get(url)
+        if location is None:
+            return None
+        archive_path, offset, length = location
+        with open(archive_path, 'rb') as file:
+            file.seek(offset)
+            record = gzip.decompress(file.read(length))
+        return self._parse_record(url, record)
+
+    @staticmethod
+    def _parse_record(url: str, record: bytes):
+        """
+        Builds a response from WARC record
+        """
+        _, block = record.split(b'\r\n\r\n', 1)
+        http_head, body = block[:-len(b'\r\n\r\n')].split(b'\r\n\r\n', 1)
+        status_line, *header_lines = http_head.decode('utf-8').split('\r\n')
+        response = requests.Response()
+        response.status_code = int(status_line.split(' ', 2)[1])
+        response.url = url
+        for header_line in header_lines:
+            name, value = header_line.split(': ', 1)
+            response.headers[name] = value
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        # pylint: disable=protected-access
+        response._content = body
+        response._content_consumed = True
+        return response
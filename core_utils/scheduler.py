@@ -0,0 +1,31 @@
+"""
+Asynchronous crawl scheduler implementation
+"""
+import asyncio
+
+
+async def fetch_as_completed(urls, fetch, max_in_flight: int):
+    """
+    Fetches URLs with at most max_in_flight requests at a time
+    and yields (url, result) pairs as soon as each fetch finishes.
+    fetch is a blocking callable, it runs in a worker thread,
+    per-host politeness is up to the rate limiter of the HTTP client behind it,
+    failed fetches are yielded as exceptions.
+    Fetches that have not started yet are cancelled once the consumer stops iterating
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def fetch_one(url):
+        async with semaphore:
+            try:
+                return url, await asyncio.to_thread(fetch, url)
+            except Exception as error:  # pylint: disable=broad-except
+                return url, error
+
+    tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
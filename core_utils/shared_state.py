@@ -0,0 +1,295 @@
+"""
+SQLite-backed crawl state shared by crawler processes
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from constants import ASSETS_PATH
+
+
+class SQLiteState:
+    """
+    Connection manager of the shared state database.
+    Gives every thread its own connection to the database in WAL mode,
+    so that readers do not block the single writer
+    """
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Returns connection of the calling thread
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs statements in a write transaction that locks out other writers from the start
+        """
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+
+class SQLiteFrontier:
+    """
+    Crawl frontier shared by crawler processes.
+    Has the interface of CrawlFrontier, URLs are claimed by one process at a time,
+    claims of processes that died are taken over after claim_timeout seconds.
+    Deferred URLs are queued with the time they may be claimed again
+    """
+    def __init__(self, state: SQLiteState, max_attempts: int = 2, claim_timeout: float = 600.0):
+        self._state = state
+        self._max_attempts = max_attempts
+        self._claim_timeout = claim_timeout
+        self._state.get_connection().execute(
+            'CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, priority INTEGER NOT NULL, '
+            'attempts INTEGER NOT NULL DEFAULT 0, state TEXT NOT NULL, claimed_at REAL, not_before REAL)')
+        self._state.get_connection().execute(
+            'CREATE TABLE IF NOT EXISTS discovery (id INTEGER PRIMARY KEY CHECK (id = 1), finished INTEGER NOT NULL)')
+        columns = [row[1] for row in self._state.get_connection().execute('PRAGMA table_info(frontier)')]
+        if 'not_before' not in columns:
+            self._state.get_connection().execute('ALTER TABLE frontier ADD COLUMN not_before REAL')
+        self._state.get_connection().execute(
+            'CREATE INDEX IF NOT EXISTS frontier_order ON frontier (state, attempts, priority)')
+
+    def add(self, url: str, priority: int = 0) -> bool:
+        """
+        Queues URL that has not been seen yet, returns False for already seen ones
+        """
+        cursor = self._state.get_connection().execute(
+            "INSERT OR IGNORE INTO frontier (url, priority, state) VALUES (?, ?, 'queued')", (url, priority))
+        return cursor.rowcount == 1
+
+    def pop(self):
+        """
+        Claims queued URL with the highest priority, returns None if there is nothing to claim
+        """
+        now = time.time()
+        with self._state.transaction() as connection:
+            row = connection.execute(
+                "SELECT url FROM frontier WHERE state = 'queued' AND (not_before IS NULL OR not_before <= ?) "
+                "OR state = 'claimed' AND claimed_at < ? "
+                "ORDER BY attempts, priority DESC LIMIT 1", (now, now - self._claim_timeout)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE frontier SET state = 'claimed', claimed_at = ? WHERE url = ?", (now, row[0]))
+        return row[0]
+
+    def requeue(self, url: str) -> bool:
+        """
+        Puts failed URL back to the frontier, returns False once its attempts are over
+        """
+        with self._state.transaction() as connection:
+            row = connection.execute('SELECT attempts FROM frontier WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return False
+            attempts = row[0] + 1
+            state = 'queued' if attempts < self._max_attempts else 'failed'
+            connection.execute('UPDATE frontier SET attempts = ?, state = ? WHERE url = ?', (attempts, state, url))
+        return state == 'queued'
+
+    def defer(self, url: str, delay: float):
+        """
+        Puts claimed URL back to the frontier, it can be claimed again in delay seconds
+        """
+        self._state.get_connection().execute(
+            "UPDATE frontier SET state = 'queued', not_before = ? WHERE url = ?", (time.time() + delay, url))
+
+    def get_delay(self):
+        """
+        Returns seconds until the next deferred URL is due, None if no URL is deferred
+        """
+        now = time.time()
+        row = self._state.get_connection().execute(
+            "SELECT MIN(not_before) FROM frontier WHERE state = 'queued' AND not_before > ?", (now,)).fetchone()
+        return None if row[0] is None else row[0] - now
+
+    def mark_done(self, url: str):
+        """
+        Remembers that the URL is processed
+        """
+        self._state.get_connection().execute("UPDATE frontier SET state = 'done' WHERE url = ?", (url,))
+
+    def get_entries(self) -> list:
+        """
+        Returns URLs that are queued or being processed together with their priorities and attempts
+        """
+        rows = self._state.get_connection().execute(
+            "SELECT url, priority, attempts FROM frontier WHERE state IN ('queued', 'claimed')").fetchall()
+        return [{'url': url, 'priority': priority, 'attempts': attempts} for url, priority, attempts in rows]
+
+    def restore(self, entries: list):
+        """
+        Queues URLs saved with get_entries that are not known yet
+        """
+        with self._state.transaction() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority, attempts, state) VALUES (?, ?, ?, 'queued')",
+                [(entry['url'], entry['priority'], entry['attempts']) for entry in entries])
+
+    def get_urls(self) -> list:
+        """
+        Returns all URLs added to the frontier, including processed and failed ones
+        """
+        return [row[0] for row in self._state.get_connection().execute('SELECT url FROM frontier ORDER BY rowid')]
+
+    def release_claims(self):
+        """
+        Puts URLs claimed by processes of the previous crawl back to the queue.
+        Must be called only when no process is taking URLs
+        """
+        self._state.get_connection().execute("UPDATE frontier SET state = 'queued' WHERE state = 'claimed'")
+
+    def set_discovery_finished(self, finished: bool):
+        """
+        Tells processes that only parse articles whether URLs are still being discovered
+        """
+        self._state.get_connection().execute(
+            'INSERT OR REPLACE INTO discovery (id, finished) VALUES (1, ?)', (int(finished),))
+
+    def is_discovery_finished(self) -> bool:
+        """
+        Checks that the discovering process has found all URLs it is going to add
+        """
+        row = self._state.get_connection().execute('SELECT finished FROM discovery WHERE id = 1').fetchone()
+        return bool(row and row[0])
+
+    def clear(self):
+        """
+        Forgets all seen, processed and queued URLs
+        """
+        self._state.get_connection().execute('DELETE FROM frontier')
+
+    def __len__(self):
+        return self._state.get_connection().execute(
+            "SELECT COUNT(*) FROM frontier WHERE state = 'queued' AND (not_before IS NULL OR not_before <= ?)",
+            (time.time(),)).fetchone()[0]
+
+
+class SQLiteJournal:
+    """
+    Crawl journal shared by crawler processes.
+    Has the interface of CrawlJournal, article ids are allocated centrally,
+    so processes writing to the same ASSETS_PATH never take the same id
+    """
+    def __init__(self, state: SQLiteState):
+        self._state = state
+        connection = self._state.get_connection()
+        connection.execute('CREATE TABLE IF NOT EXISTS articles '
+                           '(url TEXT PRIMARY KEY, id INTEGER UNIQUE NOT NULL, hash TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS reserved_ids (id INTEGER PRIMARY KEY, url TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS released_ids (id INTEGER PRIMARY KEY)')
+
+    def get_article_id(self, url: str):
+        """
+        Returns id given to the URL during previous crawls, None for new URLs
+        """
+        row = self._state.get_connection().execute('SELECT id FROM articles WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+
+    def get_next_article_id(self) -> int:
+        """
+        Returns id that continues numeration of already collected and reserved articles
+        """
+        row = self._state.get_connection().execute(
+            'SELECT MAX(id) FROM (SELECT id FROM articles UNION ALL SELECT id FROM reserved_ids '
+            'UNION ALL SELECT id FROM released_ids)').fetchone()
+        return (row[0] or 0) + 1
+
+    def reserve_article_id(self, url: str) -> int:
+        """
+        Returns id for the URL: the known one or the lowest id not taken yet
+        """
+        with self._state.transaction() as connection:
+            row = connection.execute('SELECT id FROM articles WHERE url = ?', (url,)).fetchone()
+            if row:
+                return row[0]
+            row = connection.execute('SELECT MIN(id) FROM released_ids').fetchone()
+            if row[0] is not None:
+                connection.execute('DELETE FROM released_ids WHERE id = ?', (row[0],))
+                article_id = row[0]
+            else:
+                article_id = self.get_next_article_id()
+            connection.execute('INSERT INTO reserved_ids (id, url) VALUES (?, ?)', (article_id, url))
+        return article_id
+
+    def release_article_id(self, url: str, article_id: int):
+        """
+        Returns id reserved for a new URL that was not collected
+        """
+        with self._state.transaction() as connection:
+            connection.execute('DELETE FROM reserved_ids WHERE id = ?', (article_id,))
+            if connection.execute('SELECT 1 FROM articles WHERE url = ?', (url,)).fetchone() is None:
+                connection.execute('INSERT OR IGNORE INTO released_ids (id) VALUES (?)', (article_id,))
+
+    def compact(self):
+        """
+        Fills gaps left by released ids and by ids reserved by processes that died
+        with the articles that have the highest ids.
+        Returns list of (old_id, new_id) pairs of moved articles.
+        Must be called only when no process is collecting articles
+        """
+        moves = []
+        with self._state.transaction() as connection:
+            free_ids = [row[0] for row in connection.execute(
+                'SELECT id FROM released_ids UNION SELECT id FROM reserved_ids '
+                'WHERE id NOT IN (SELECT id FROM articles) ORDER BY id')]
+            for free_id in free_ids:
+                row = connection.execute('SELECT url, id FROM articles ORDER BY id DESC LIMIT 1').fetchone()
+                if row is None or row[1] < free_id:
+                    break
+                moves.append((row[1], free_id))
+                connection.execute('UPDATE articles SET id = ? WHERE url = ?', (free_id, row[0]))
+            connection.execute('DELETE FROM released_ids')
+            connection.execute('DELETE FROM reserved_ids')
+        return moves
+
+    def is_unchanged(self, url: str, content_hash: str) -> bool:
+        """
+        Checks that the article is already collected and its page has not changed since
+        """
+        row = self._state.get_connection().execute('SELECT id, hash FROM articles WHERE url = ?', (url,)).fetchone()
+        if not row or row[1] != content_hash:
+            return False
+        return (ASSETS_PATH / f'{row[0]}_raw.txt').exists()
+
+    def record(self, url: str, article_id: int, content_hash: str):
+        """
+        Remembers that the URL is collected under the given id
+        """
+        with self._state.transaction() as connection:
+            connection.execute('DELETE FROM reserved_ids WHERE id = ?', (article_id,))
+            connection.execute('INSERT OR REPLACE INTO articles (url, id, hash) VALUES (?, ?, ?)',
+                               (url, article_id, content_hash))
+
+    def clear(self):
+        """
+        Forgets all collected articles
+        """
+        with self._state.transaction() as connection:
+            for table in ('articles', 'reserved_ids', 'released_ids'):
+                connection.execute(f'DELETE FROM {table}')
+
+    def save(self):
+        """
+        Every change is already committed, kept for compatibility with CrawlJournal
+        """
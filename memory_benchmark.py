@@ -0,0 +1,92 @@
+"""
+Memory footprint benchmark of articles and morphological tokens
+"""
+import json
+import sys
+import tracemalloc
+
+from pymorphy2 import MorphAnalyzer
+
+from core_utils.article import Article
+from pipeline import MorphologicalToken
+
+WORDS = ('Лингвистика', 'изучает', 'язык', 'как', 'систему', 'знаков', 'и', 'его', 'функции', 'в', 'обществе')
+TAGS_MYSTEM = ('S,жен,неод=им,ед', 'V,несов,пе=непрош,ед,изъяв,3-л', 'S,муж,неод=им,ед', 'CONJ=',
+               'S,жен,неод=вин,ед', 'S,муж,неод=род,мн', 'CONJ=', 'SPRO,ед,3-л,муж=род', 'S,жен,неод=вин,мн',
+               'PR=', 'S,сред,неод=пр,ед')
+
+
+class _DictToken:
+    """
+    Token with an instance dict that keeps the OpencorporaTag object, as tokens did before
+    """
+
+    def __init__(self, original_word):
+        self.original_word = original_word
+        self.normalized_form = ''
+        self.tags_mystem = ''
+        self.tags_pymorphy = ''
+
+
+def _analyze(count: int) -> list:
+    """
+    Returns Mystem analysis of a text with count words.
+    The analysis goes through JSON, as Mystem output does, so every word gets new string objects
+    """
+    analysis = [{'text': WORDS[index % len(WORDS)],
+                 'analysis': [{'lex': WORDS[index % len(WORDS)].lower(), 'gr': TAGS_MYSTEM[index % len(WORDS)]}]}
+                for index in range(count)]
+    return json.loads(json.dumps(analysis, ensure_ascii=False))
+
+
+def _create_dict_tokens(analyzed_text: list, morph: MorphAnalyzer) -> list:
+    tokens = []
+    for token in analyzed_text:
+        dict_token = _DictToken(token['text'])
+        dict_token.normalized_form = token['analysis'][0]['lex']
+        dict_token.tags_mystem = token['analysis'][0]['gr']
+        dict_token.tags_pymorphy = morph.parse(token['text'])[0].tag
+        tokens.append(dict_token)
+    return tokens
+
+
+def _create_tokens(analyzed_text: list, morph: MorphAnalyzer) -> list:
+    tokens = []
+    for token in analyzed_text:
+        morphological_token = MorphologicalToken(token['text'])
+        morphological_token.normalized_form = sys.intern(token['analysis'][0]['lex'])
+        morphological_token.tags_mystem = sys.intern(token['analysis'][0]['gr'])
+        morphological_token.tags_pymorphy = sys.intern(str(morph.parse(token['text'])[0].tag))
+        tokens.append(morphological_token)
+    return tokens
+
+
+def measure(factory, count: int) -> float:
+    """
+    Returns number of bytes allocated per object created by the factory
+    """
+    tracemalloc.start()
+    objects = factory(count)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return allocated / count
+
+
+def main(count: int = 10000):
+    """
+    Reports memory taken by a token of a text with count words and by an article
+    """
+    morph = MorphAnalyzer()
+    # the first words parsed load dictionary data of the analyzer, it is not counted as memory of tokens
+    _create_dict_tokens(_analyze(len(WORDS)), morph)
+    dict_token = measure(lambda number: _create_dict_tokens(_analyze(number), morph), count)
+    slotted_token = measure(lambda number: _create_tokens(_analyze(number), morph), count)
+    article = measure(lambda number: [Article(url=None, article_id=index) for index in range(number)], count)
+    print(f'dict-backed token with OpencorporaTag: {dict_token:.1f} bytes')
+    print(f'MorphologicalToken: {slotted_token:.1f} bytes')
+    print(f'Article without loaded meta data: {article:.1f} bytes')
+
+
+if __name__ == '__main__':
+    main()
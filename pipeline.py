@@ -2,6 +2,7 @@
 Pipeline for text processing implementation
 """
 import re
+import sys
 from pathlib import Path
 
 from pymystem3 import Mystem
@@ -28,9 +29,13 @@ class InconsistentDatasetError(Exception):
 
 class MorphologicalToken:
     """
-    Stores language params for each processed token
+    Stores language params for each processed token.
+    Tokens are created for every word of a text, so they have no instance dict,
+    tags and lemmas are kept as interned strings shared by all tokens
     """
 
+    __slots__ = ('original_word', 'normalized_form', 'tags_mystem', 'tags_pymorphy')
+
     def __init__(self, original_word):
         self.original_word = original_word
         self.normalized_form = ''
@@ -84,6 +89,13 @@ class CorpusManager:
         """
         return self._storage
 
+    def load_meta(self):
+        """
+        Loads meta data of all articles at once, otherwise it is loaded on first access
+        """
+        for article in self._storage.values():
+            article.load_meta()
+
 
 class TextProcessingPipeline:
     """
@@ -143,12 +155,12 @@ class TextProcessingPipeline:
             if ('text' not in token) or (not token['text']):
                 continue
             morphological_token = MorphologicalToken(token['text'])
-            morphological_token.normalized_form = token['analysis'][0]['lex']
-            morphological_token.tags_mystem = token['analysis'][0]['gr']
+            morphological_token.normalized_form = sys.intern(token['analysis'][0]['lex'])
+            morphological_token.tags_mystem = sys.intern(token['analysis'][0]['gr'])
             word = morph.parse(token['text'])
             if not word:
                 continue
-            morphological_token.tags_pymorphy = word[0].tag
+            morphological_token.tags_pymorphy = sys.intern(str(word[0].tag))
             tokens.append(morphological_token)
         return tokens
 
@@ -1,20 +1,108 @@
 """
 Scrapper implementation
 """
+import argparse
+import asyncio
 from datetime import datetime
+from functools import lru_cache
+import hashlib
 import json
+import multiprocessing
+import os
 from pathlib import Path
-import random
 import re
 import shutil
-from time import sleep
+import threading
+import time
 
 from bs4 import BeautifulSoup
-import requests
+from lxml import etree
 
-from constants import ASSETS_PATH, CRAWLER_CONFIG_PATH, DOMAIN
+from constants import (ASSETS_PATH, CACHE_PATH, CHECKPOINT_PATH, CRAWL_JOURNAL_PATH, CRAWLER_CONFIG_PATH, DOMAIN,
+                       FRONTIER_PATH, METRICS_PATH, RESPONSE_ARCHIVE_PATH, SHARED_STATE_PATH, TRACE_PATH)
 from core_utils.article import Article
-from core_utils.pdf_utils import PDFRawFile
+from core_utils.checkpoint import CrawlCheckpoint
+from core_utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core_utils.crawl_journal import CrawlJournal
+from core_utils.extraction import ExtractionRules, get_page_text
+from core_utils.frontier import CrawlFrontier
+from core_utils.http_cache import ResponseCache
+from core_utils.http_utils import ArchiveClient, HTTPClient, get_default_client
+from core_utils.metrics import get_metrics
+from core_utils.oai_pmh import OAIHarvester
+from core_utils.ojs_archive import IssueArchive
+from core_utils.pdf_utils import PDFRawFile, shutdown_extraction_pool
+from core_utils.rate_limiter import AdaptiveRateLimiter
+from core_utils.response_archive import ResponseArchive
+from core_utils.scheduler import fetch_as_completed
+from core_utils.shared_state import SQLiteFrontier, SQLiteJournal, SQLiteState
+
+DISCOVERY_MODES = ('html', 'archive', 'oai')
+MAX_ARTICLES = 200
+WORKER_WAIT_INTERVAL = 1.0
+BIBLIOGRAPHY_MARKER = 'СПИСОК ЛИТЕРАТУРЫ'
+OAI_PATH = 'oai'
+ARCHIVE_PATH = 'issue/archive'
+
+# default selectors fit OJS journals, site profiles override them one by one
+ISSUE_PAGE_SELECTORS = {
+    'article_summary': 'div.obj_article_summary',
+    'article_link': 'div.title a',
+    'galley_link': 'a.obj_galley_link'
+}
+ARTICLE_PAGE_FIELDS = {
+    'title': {'tag': 'h1', 'classes': 'page_title'},
+    'author': {'tag': 'ul', 'classes': 'item authors', 'value_path': 'string((./li[1]//span)[1])'},
+    'keywords': {'tag': 'div', 'classes': 'item keywords', 'value_path': 'string((.//span[@class="value"])[1])'},
+    'date': {'tag': 'div', 'classes': 'item published', 'value_path': 'string((.//div[@class="value"])[1])'},
+    'html_galley_urls': {'tag': 'a', 'classes': 'obj_galley_link file',
+                         'value_path': '@href[contains(string(..), "HTML")]', 'many': True},
+    'pdf_galley_urls': {'tag': 'a', 'classes': 'obj_galley_link pdf', 'value_path': '@href', 'many': True},
+    'issue_url': {'tag': 'nav', 'value_path': 'ol/li[3]/a/@href'}
+}
+GALLEY_PAGE_FIELDS = {
+    'download_url': {'tag': 'a', 'classes': 'download', 'value_path': '@href'},
+    'frame_url': {'tag': 'iframe', 'value_path': '@src'}
+}
+PAGE_FIELDS = {'article_page': ARTICLE_PAGE_FIELDS, 'galley_page': GALLEY_PAGE_FIELDS}
+SITE_OPTIONS = ('discovery', 'scale_mode', 'max_in_flight_requests', 'requests_per_second',
+                'min_requests_per_second', 'max_requests_per_second', 'burst_size', 'parser_workers',
+                'parser_queue_size', 'max_url_attempts', 'selectors')
+
+CRAWLING_OPTIONS = {
+    'discovery': 'html',
+    'scale_mode': False,
+    'max_in_flight_requests': 4,
+    'requests_per_second': 2.0,
+    'min_requests_per_second': 0.2,
+    'max_requests_per_second': 8.0,
+    'burst_size': 2,
+    'connect_timeout': 5.0,
+    'request_timeout': 30.0,
+    'crawl_time_budget': 0.0,
+    'circuit_breaker_threshold': 5,
+    'circuit_breaker_cooldown': 60.0,
+    'max_retries': 3,
+    'backoff_factor': 0.5,
+    'connection_pool_size': 10,
+    'use_http_cache': True,
+    'http_cache_max_size_mb': 512,
+    'archive_responses': False,
+    'offline': False,
+    'incremental': False,
+    'parser_workers': 4,
+    'parser_queue_size': 16,
+    'max_url_attempts': 2,
+    'checkpoint_interval': 30.0,
+    'collect_metrics': True,
+    'selectors': {},
+    'persist_pdfs': False,
+    'max_pdf_size_mb': 50,
+    'use_blob_store': True,
+    'blob_store_max_size_mb': 1024,
+    'blob_store_max_age_days': 30,
+    'pdf_extraction_workers': os.cpu_count() or 1
+}
 
 
 class IncorrectURLError(Exception):
@@ -35,38 +123,178 @@ class IncorrectNumberOfArticlesError(Exception):
     """
 
 
+class IncorrectCrawlingOptionError(Exception):
+    """
+    Optional crawling parameter has incorrect type or value
+    """
+
+
+@lru_cache(maxsize=None)
+def _compile_page_rules(fields_json: str) -> ExtractionRules:
+    return ExtractionRules.from_spec(json.loads(fields_json))
+
+
+def get_page_rules(default_fields: dict, site_fields: dict = None) -> ExtractionRules:
+    """
+    Returns extraction rules of a page, fields given by the site profile replace default ones.
+    Rules are compiled once for every distinct set of fields
+    """
+    fields = dict(default_fields, **(site_fields or {}))
+    return _compile_page_rules(json.dumps(fields, sort_keys=True))
+
+
+def get_issue_page_selectors(options) -> dict:
+    """
+    Returns CSS selectors of the issue page, the ones given by the site profile replace default ones
+    """
+    site_selectors = options['selectors']
+    return {name: site_selectors.get(name, selector) for name, selector in ISSUE_PAGE_SELECTORS.items()}
+
+
+def get_galley_urls(article_summary_bs, galley_link_selector: str = ISSUE_PAGE_SELECTORS['galley_link']) -> dict:
+    """
+    Finds HTML full-text and PDF galley links of an article summary on the issue page
+    """
+    galley_urls = {}
+    for link_bs in article_summary_bs.select(galley_link_selector):
+        if 'pdf' in link_bs.get('class', []) or 'PDF' in link_bs.text.upper():
+            galley_urls.setdefault('pdf', link_bs['href'])
+        elif 'HTML' in link_bs.text.upper():
+            galley_urls.setdefault('html', link_bs['href'])
+    return galley_urls
+
+
 class Crawler:
     """
     Crawler implementation
     """
 
-    def __init__(self, seed_urls, total_max_articles: int):
+    def __init__(self, seed_urls, total_max_articles: int, options: dict = None, http_client=None, *,
+                 frontier=None):
         self.seed_urls = seed_urls
         self.total_max_articles = total_max_articles
         self.urls = []
+        self.discovered = {}
+        self._options = dict(CRAWLING_OPTIONS, **(options or {}))
+        self._http_client = http_client or get_default_client()
+        self.frontier = frontier if frontier is not None else CrawlFrontier(
+            max_attempts=self._options['max_url_attempts'])
+
+    @property
+    def domain(self):
+        """
+        Returns address of the journal, given in site options for journals other than DOMAIN
+        """
+        return self._options.get('domain', DOMAIN).rstrip('/') + '/'
+
+    @staticmethod
+    def _get_priority(article_url):
+        """
+        OJS gives articles increasing ids, so newer articles get higher priority
+        """
+        article_id = re.search(r'/article/view/(\d+)', article_url)
+        return int(article_id.group(1)) if article_id else 0
+
+    def _add_url(self, article_url):
+        if not self.frontier.add(article_url, self._get_priority(article_url)):
+            return False
+        self.urls.append(article_url)
+        return True
 
     def _extract_url(self, article_bs):
-        article_summaries_bs = article_bs.find_all("div", class_="obj_article_summary")
+        found_urls = []
+        selectors = get_issue_page_selectors(self._options)
+        article_summaries_bs = article_bs.select(selectors['article_summary'])
         for article_summary_bs in article_summaries_bs:
-            link_to_pdf = article_summary_bs.find('a', class_='obj_galley_link pdf')
-            if link_to_pdf and len(self.urls) < self.total_max_articles:
-                self.urls.append(article_summary_bs.find('div', class_='title').find('a')['href'])
+            galley_urls = get_galley_urls(article_summary_bs, selectors['galley_link'])
+            if galley_urls and len(self.urls) < self.total_max_articles:
+                article_url = article_summary_bs.select_one(selectors['article_link'])['href']
+                if not self._add_url(article_url):
+                    continue
+                self.discovered[article_url] = {'galley_urls': galley_urls}
+                found_urls.append(article_url)
+        return found_urls
 
     def find_articles(self):
         """
         Finds articles
         """
+        asyncio.run(self.find_articles_async())
 
-        for url in self.seed_urls:
-            response = requests.get(url)
-            sleep_period = random.randint(1, 3)
-            sleep(sleep_period)
+    async def find_articles_async(self):
+        """
+        Finds articles fetching seed URLs concurrently
+        """
+        async for _ in self.iter_articles():
+            pass
+
+    async def iter_articles(self):
+        """
+        Yields article URLs as soon as they are found on seed pages,
+        on pages of all issues from the journal archive
+        or in OAI-PMH records, depending on discovery mode.
+        Every yielded URL is already queued in the crawl frontier, URLs seen before are skipped.
+        Stops discovery once total_max_articles URLs are found
+        """
+        articles = self._iter_oai_articles() if self._options['discovery'] == 'oai' else self._iter_html_articles()
+        try:
+            async for article_url in articles:
+                yield article_url
+        finally:
+            await articles.aclose()
 
-            if not response.ok:
+    async def _iter_oai_articles(self):
+        """
+        Harvests article URLs with their metadata from the OAI-PMH endpoint of the journal
+        """
+        records = OAIHarvester(self.domain + OAI_PATH, self._http_client).iter_records()
+        while len(self.urls) < self.total_max_articles:
+            record = await asyncio.to_thread(next, records, None)
+            if record is None:
+                return
+            if not self._add_url(record['url']):
                 continue
+            self.discovered[record['url']] = {'meta': record}
+            yield record['url']
+
+    async def _iter_html_articles(self):
+        """
+        Scrapes article URLs from seed pages
+        """
+        if self._options['discovery'] == 'archive':
+            await self._add_archive_issues()
+        responses = fetch_as_completed(self.seed_urls, self._http_client.get,
+                                       self._options['max_in_flight_requests'])
+        try:
+            async for _, response in responses:
+                if isinstance(response, Exception) or not response.ok:
+                    continue
+
+                soup = BeautifulSoup(response.text, 'lxml')
+                for article_url in self._extract_url(soup):
+                    yield article_url
 
-            soup = BeautifulSoup(response.text, 'lxml')
-            self._extract_url(soup)
+                if len(self.urls) >= self.total_max_articles:
+                    break
+        finally:
+            await responses.aclose()
+
+    async def _add_archive_issues(self):
+        """
+        Adds every issue listed in the journal archive to seed URLs
+        """
+        issue_urls = IssueArchive(self.domain + ARCHIVE_PATH, self._http_client).iter_issue_urls()
+        seed_urls = list(self.seed_urls)
+        try:
+            while True:
+                issue_url = await asyncio.to_thread(next, issue_urls, None)
+                if issue_url is None:
+                    break
+                if issue_url not in seed_urls:
+                    seed_urls.append(issue_url)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f'the issue archive is not fully traversed: {error}')
+        self.seed_urls = seed_urls
 
     def get_search_urls(self):
         """
@@ -76,68 +304,439 @@ class Crawler:
 
 
 class HTMLParser:
-    def __init__(self, article_url, article_id):
+    def __init__(self, article_url, article_id, http_client=None, options: dict = None):
         self.article_url = article_url
         self.article_id = article_id
         self.article = Article(article_url, article_id)
+        self._http_client = http_client or get_default_client()
+        self._options = dict(CRAWLING_OPTIONS, **(options or {}))
+        self._discovered = {}
+        self._response = None
+
+    def _get_page_rules(self, page: str) -> ExtractionRules:
+        """
+        Returns extraction rules of the article or galley page with selectors of the site
+        """
+        return get_page_rules(PAGE_FIELDS[page], self._options['selectors'].get(page))
+
+    def set_galley_urls(self, galley_urls: dict):
+        """
+        Sets HTML and PDF galley links that are already known, e.g. found on the issue page
+        """
+        self._discovered['galley_urls'] = galley_urls
+
+    def set_meta_information(self, meta: dict):
+        """
+        Fills article with metadata that is already known, e.g. harvested with OAI-PMH
+        """
+        self.article.title = meta['title']
+        self.article.author = meta['author']
+        self.article.topics = meta['topics']
+        self.article.date = meta['date'] or datetime.strptime('2021', '%Y')
+        self._discovered['meta'] = meta
 
-    def _fill_article_with_text(self, article_bs):
-        title = article_bs.find('h1', class_='page_title').text.strip()
-        back_to_seed = article_bs.select_one('nav ol li:nth-child(3) a')['href']
-        seed_bs = BeautifulSoup(requests.get(back_to_seed).text, 'lxml')
-        sections = seed_bs.find_all("div", class_="obj_article_summary")
-        urls_bs = [section.find('a', class_='obj_galley_link pdf') for section in sections if title in section.text]
-        for url_bs in urls_bs:
-            art_soup = BeautifulSoup(requests.get(url_bs['href']).text, 'lxml')
-            download_pdf = art_soup.find('a', class_='download')['href']
-            pdf = PDFRawFile(download_pdf, self.article_id)
+    def _find_galley_urls(self, page_values):
+        """
+        Finds HTML and PDF galley links on the article page
+        or on the issue page the article belongs to
+        """
+        galley_urls = {kind: page_values[f'{kind}_galley_urls'][0] for kind in ('html', 'pdf')
+                       if f'{kind}_galley_urls' in page_values}
+        if galley_urls:
+            return galley_urls
+        title = page_values['title']
+        back_to_seed = page_values['issue_url']
+        seed_bs = BeautifulSoup(self._http_client.get(back_to_seed).text, 'lxml')
+        selectors = get_issue_page_selectors(self._options)
+        for section in seed_bs.select(selectors['article_summary']):
+            if title in section.text:
+                return get_galley_urls(section, selectors['galley_link'])
+        return {}
+
+    def _get_html_galley_text(self, galley_url):
+        """
+        Returns text of the HTML full-text galley shown in a frame of the galley page
+        """
+        with get_metrics().measure('html_galley', self.article_url):
+            galley_values = self._get_page_rules('galley_page').extract(self._http_client.get(galley_url).text)
+            text_url = galley_values.get('frame_url') or galley_values.get('download_url')
+            if text_url is None:
+                return ''
+            return get_page_text(self._http_client.get(text_url).content, stop_marker=BIBLIOGRAPHY_MARKER)
+
+    def _get_pdf_galley_text(self, galley_url):
+        """
+        Returns text of the PDF galley
+        """
+        with get_metrics().measure('pdf_download', self.article_url):
+            galley_values = self._get_page_rules('galley_page').extract(self._http_client.get(galley_url).text)
+            pdf = PDFRawFile(galley_values['download_url'], self.article_id, self._http_client, self._options)
             pdf.download()
-            self.article.text = pdf.get_text().split('СПИСОК ЛИТЕРАТУРЫ')[0]
+        with get_metrics().measure('pdf_extract', self.article_url):
+            return pdf.get_text(stop_marker=BIBLIOGRAPHY_MARKER)
+
+    def _fill_article_with_text(self, page_values):
+        """
+        Takes text from the HTML full-text galley, the PDF galley is used only if there is no HTML one
+        """
+        galley_urls = self._discovered.get('galley_urls') or self._find_galley_urls(page_values)
+        if 'html' in galley_urls:
+            self.article.text = self._get_html_galley_text(galley_urls['html'])
+            self.article.text_source = 'html'
+        if not self.article.text and 'pdf' in galley_urls:
+            self.article.text = self._get_pdf_galley_text(galley_urls['pdf'])
+            self.article.text_source = 'pdf'
+
+    def _fill_article_with_meta_information(self, page_values):
+        self.article.title = page_values.get('title', 'NOT FOUND')
+        if 'author' in page_values:
+            self.article.author = page_values['author']
+        if 'keywords' in page_values:
+            self.article.topics = page_values['keywords'].replace('\t', "").split(', ')
+        date = page_values.get('date', '2021-01-01')
+        self.article.date = datetime.strptime(date, '%Y-%m-%d')
+
+    def _get_response(self):
+        if self._response is None:
+            self._response = self._http_client.get(self.article_url)
+        return self._response
+
+    def get_page_hash(self):
+        """
+        Returns hash of the article page content
+        """
+        return hashlib.sha256(self._get_response().content).hexdigest()
+
+    def parse(self):
+        response = self._get_response()
 
-    def _fill_article_with_meta_information(self, article_bs):
-        # title
+        with get_metrics().measure('html_parse', self.article_url):
+            page_values = self._get_page_rules('article_page').extract(response.text)
+
+        self._fill_article_with_text(page_values)
+        if self.article.text and 'meta' not in self._discovered:
+            self._fill_article_with_meta_information(page_values)
+        return self.article
+
+
+def collect_article(art_url, article_crawler, journal, http_client, options):
+    """
+    Parses and saves a single article unless it is already collected and unchanged.
+    Returns False if the article could not be downloaded and is worth another attempt,
+    raises CircuitOpenError if requests to its host are suspended
+    """
+    art_id = journal.reserve_article_id(art_url)
+    article_parser = HTMLParser(article_url=art_url, article_id=art_id, http_client=http_client, options=options)
+    discovered = article_crawler.discovered.get(art_url, {})
+    if 'galley_urls' in discovered:
+        article_parser.set_galley_urls(discovered['galley_urls'])
+    if 'meta' in discovered:
+        article_parser.set_meta_information(discovered['meta'])
+    try:
+        page_hash = article_parser.get_page_hash()
+        if journal.is_unchanged(art_url, page_hash):
+            print(f'the {art_id} article is not changed')
+            return True
+        article = article_parser.parse()
+    except CircuitOpenError:
+        journal.release_article_id(art_url, art_id)
+        raise
+    except Exception as error:  # pylint: disable=broad-except
+        print(f'the article {art_url} is not downloaded: {error}')
+        journal.release_article_id(art_url, art_id)
+        return False
+    if not article.text:
+        journal.release_article_id(art_url, art_id)
+        return True
+    with get_metrics().measure('save', art_url):
+        article.save_raw()
+        journal.record(art_url, art_id, page_hash)
+        journal.save()
+    print(f'the {art_id} article is successfully downloaded')
+    return True
+
+
+def collect_frontier_article(art_url, article_crawler, journal, http_client, options):
+    """
+    Collects an article taken from the crawl frontier and marks it done,
+    postpones it if requests to its host are suspended or requeues it if it failed.
+    Returns True if the article is requeued and can be taken right away
+    """
+    frontier = article_crawler.frontier
+    try:
+        collected = collect_article(art_url, article_crawler, journal, http_client, options)
+    except CircuitOpenError as error:
+        print(f'the article {art_url} is postponed: {error}')
+        frontier.defer(art_url, error.retry_after)
+        return False
+    if collected:
+        frontier.mark_done(art_url)
+        return False
+    # the URL stays in the frontier entries of the checkpoint without losing an attempt
+    return not http_client.is_expired() and frontier.requeue(art_url)
+
+
+def collect_articles(article_crawler, journal, http_client, options, checkpoint=None):
+    """
+    Parses articles in worker threads while the crawler is still discovering them.
+    Workers take URLs from the crawl frontier, so newer articles go first
+    and failed ones are retried after the fresh ones.
+    Discovery and parsing stop as soon as the crawl time budget is spent,
+    URLs that are not parsed by then stay in the frontier for the resumed crawl.
+    Crawler state is checkpointed while articles are collected
+    """
+    frontier = article_crawler.frontier
+    frontier_changed = threading.Condition()
+    discovery = {'finished': False}
+    workers = []
+
+    def take_url():
+        with frontier_changed:
+            while True:
+                art_url = None if http_client.is_expired() else frontier.pop()
+                delay = frontier.get_delay()
+                if art_url is not None or discovery['finished'] and delay is None or http_client.is_expired():
+                    frontier_changed.notify_all()
+                    return art_url
+                frontier_changed.wait(min(WORKER_WAIT_INTERVAL, delay or WORKER_WAIT_INTERVAL))
+
+    def parse_worker():
         try:
-            self.article.title = article_bs.find('h1', class_='page_title').text.strip()
-        except AttributeError:
-            self.article.title = 'NOT FOUND'
-        # author
+            while True:
+                art_url = take_url()
+                if art_url is None:
+                    return
+                requeued = collect_frontier_article(art_url, article_crawler, journal, http_client, options)
+                if checkpoint:
+                    checkpoint.save_if_due(article_crawler)
+                if requeued:
+                    with frontier_changed:
+                        frontier_changed.notify_all()
+        finally:
+            with frontier_changed:
+                frontier_changed.notify_all()
+
+    def can_discover():
+        return (len(frontier) < options['parser_queue_size'] or discovery['finished']
+                or http_client.is_expired() or not any(worker.is_alive() for worker in workers))
+
+    def wait_for_workers():
+        waiting_started = time.monotonic()
+        with frontier_changed:
+            frontier_changed.notify_all()
+            # the budget can run out while nobody notifies, so the predicate is checked periodically
+            while not frontier_changed.wait_for(can_discover, timeout=WORKER_WAIT_INTERVAL):
+                pass
+        return time.monotonic() - waiting_started
+
+    async def discover():
+        # time spent waiting for parser workers is not discovery time
+        started = time.monotonic()
+        waiting_time = 0.0
         try:
-            self.article.author = article_bs.find('ul', class_='item authors').find('li').find('span').text.strip()
-        except AttributeError:
-            self.article.title = 'NOT FOUND'
+            async for _ in article_crawler.iter_articles():
+                if http_client.is_expired():
+                    print('the crawl time budget is spent')
+                    break
+                waiting_time += await asyncio.to_thread(wait_for_workers)
+        finally:
+            get_metrics().record_stage('discovery', time.monotonic() - started - waiting_time)
+
+    workers.extend(threading.Thread(target=parse_worker) for _ in range(options['parser_workers']))
+    for worker in workers:
+        worker.start()
+    try:
+        asyncio.run(discover())
+        if checkpoint:
+            checkpoint.save(article_crawler)
+    finally:
+        with frontier_changed:
+            discovery['finished'] = True
+            frontier_changed.notify_all()
+        for worker in workers:
+            worker.join()
+
+
+def collect_sites(sites, journal, http_client):
+    """
+    Collects articles of several sites at once.
+    Every site has its own frontier, discovery and parser workers,
+    politeness to each host is kept by its own limits in the rate limiter of the shared HTTP client
+    """
+    site_threads = [threading.Thread(target=collect_articles,
+                                     args=(crawler, journal, http_client, site_options, checkpoint))
+                    for crawler, site_options, checkpoint in sites]
+    for site_thread in site_threads:
+        site_thread.start()
+    for site_thread in site_threads:
+        site_thread.join()
 
-        # topics
-        try:
-            self.article.topics = article_bs.find('div', class_='item keywords').find(
-                'span', class_='value').text.strip().replace('\t', "").split(', ')
-        except AttributeError:
-            self.article.title = 'NOT FOUND'
 
-        # date
-        try:
-            date = article_bs.find('div', class_='item published').find('div', class_='value').text.strip()
-            self.article.date = datetime.strptime(date, '%Y-%m-%d')
-        except AttributeError:
-            self.article.date = datetime.strptime('2021', '%Y')
+def get_site_path(path: Path, domain: str) -> Path:
+    """
+    Returns path of a state file of the site, the journal of DOMAIN keeps the path given
+    """
+    if domain == DOMAIN:
+        return path
+    site_name = re.sub(r'\W+', '_', re.sub(r'^https?://', '', domain)).strip('_')
+    return path.with_name(f'{path.stem}_{site_name}{path.suffix}')
 
-    def parse(self):
-        response = requests.get(url=self.article_url)
 
-        article_bs = BeautifulSoup(response.text, 'lxml')
+def compact_articles(journal):
+    """
+    Renumbers collected articles so that their ids have no gaps
+    """
+    for old_id, new_id in journal.compact():
+        move_article(old_id, new_id)
+    journal.save()
 
-        self._fill_article_with_text(article_bs)
-        if self.article.text:
-            self._fill_article_with_meta_information(article_bs)
-        return self.article
+
+def get_shard_options(options, shards: int):
+    """
+    Splits request rate between shards, so that together they are as polite as a single crawler
+    """
+    shard_options = dict(options)
+    for name in ('requests_per_second', 'min_requests_per_second', 'max_requests_per_second'):
+        shard_options[name] = options[name] / shards
+    return shard_options
 
 
-def prepare_environment(base_path):
+class SharedDiscoveryFollower:
     """
-    Creates ASSETS_PATH folder if not created and removes existing folder
+    Stands in for Crawler in shards that only parse articles.
+    Finds no URLs itself and lasts until the discovering shard is done,
+    so that parser workers keep taking URLs from the shared frontier meanwhile
+    """
+    def __init__(self, frontier):
+        self.frontier = frontier
+        self.urls = []
+        self.discovered = {}
+
+    async def iter_articles(self):
+        """
+        Yields None periodically until discovery of the first shard is finished
+        """
+        while not self.frontier.is_discovery_finished():
+            await asyncio.sleep(WORKER_WAIT_INTERVAL)
+            yield None
+
+
+def crawl_shard(shard_index: int, seed_urls, total_articles: int, options):
+    """
+    Collects articles in a worker process.
+    Shards share the SQLite frontier and journal. The first shard discovers articles
+    and parses them together with the other shards, so seed pages are requested once
+    """
+    state = SQLiteState(SHARED_STATE_PATH)
+    frontier = SQLiteFrontier(state, options['max_url_attempts'])
+    if options['collect_metrics']:
+        get_metrics().start_trace(TRACE_PATH.with_name(f'{TRACE_PATH.stem}_{shard_index}{TRACE_PATH.suffix}'))
+    http_client = create_http_client(options)
+    if shard_index:
+        crawler = SharedDiscoveryFollower(frontier)
+    else:
+        crawler = Crawler(seed_urls, total_articles, options, http_client, frontier=frontier)
+        # URLs found by the interrupted crawl count towards total_articles of the resumed one
+        crawler.urls = frontier.get_urls()
+    collect_articles(crawler, SQLiteJournal(state), http_client, options)
+    http_client.close()
+    shutdown_extraction_pool()
+    if options['collect_metrics']:
+        get_metrics().stop_trace()
+        get_metrics().save_summary(METRICS_PATH.with_name(f'{METRICS_PATH.stem}_{shard_index}{METRICS_PATH.suffix}'))
+
+
+def move_article(old_id, new_id):
+    """
+    Renumbers collected article files, the meta file is rewritten with the new id
+    """
+    article = Article(url=None, article_id=old_id)
+    old_meta_path = article.get_meta_file_path()
+    article.load_meta()
+    old_raw_path = article.get_raw_text_path()
+    article.article_id = new_id
+    if old_meta_path.exists():
+        article.save_meta()
+        old_meta_path.unlink()
+    moved_paths = ((old_raw_path, article.get_raw_text_path()),
+                   (ASSETS_PATH / f'{old_id}_raw.pdf', ASSETS_PATH / f'{new_id}_raw.pdf'))
+    for old_path, new_path in moved_paths:
+        if old_path.exists():
+            old_path.replace(new_path)
+
+
+def crawl_sharded(shards: int, seed_urls, total_articles: int, options, keep_collected: bool):
+    """
+    Collects articles in several processes sharing the SQLite frontier and journal
+    """
+    shared_state = SQLiteState(SHARED_STATE_PATH)
+    shared_frontier = SQLiteFrontier(shared_state)
+    shared_journal = SQLiteJournal(shared_state)
+    if not keep_collected:
+        shared_journal.clear()
+        shared_frontier.clear()
+    # URLs that processes of the interrupted crawl were working on are taken up again at once
+    shared_frontier.release_claims()
+    shared_frontier.set_discovery_finished(False)
+    shard_options = get_shard_options(options, shards)
+    shard_processes = [multiprocessing.Process(target=crawl_shard,
+                                               args=(index, seed_urls, total_articles, shard_options))
+                       for index in range(shards)]
+    for shard_process in shard_processes:
+        shard_process.start()
+    # the other shards stop once the discovering one is done, even if it died
+    shard_processes[0].join()
+    shared_frontier.set_discovery_finished(True)
+    for shard_process in shard_processes:
+        shard_process.join()
+    compact_articles(shared_journal)
+    if any(shard_process.exitcode != 0 for shard_process in shard_processes):
+        print('some crawler processes failed, run with --resume to continue the crawl')
+    elif shared_frontier.get_entries():
+        print('the crawl is not complete, run with --resume to continue it')
+    else:
+        shared_frontier.clear()
+
+
+def create_http_client(options, site_profiles=()):
+    """
+    Creates HTTP client shared by all crawling components.
+    Sites given get their own rate limits, even if they share a host.
+    In offline mode responses are read from the response archive instead of the network
+    """
+    if options['offline']:
+        return ArchiveClient(ResponseArchive(RESPONSE_ARCHIVE_PATH))
+    response_archive = ResponseArchive(RESPONSE_ARCHIVE_PATH) if options['archive_responses'] else None
+    response_cache = None
+    if options['use_http_cache']:
+        response_cache = ResponseCache(CACHE_PATH, options['http_cache_max_size_mb'] * 1024 * 1024)
+    rate_limiter = AdaptiveRateLimiter(rate=options['requests_per_second'],
+                                       min_rate=options['min_requests_per_second'],
+                                       max_rate=options['max_requests_per_second'],
+                                       burst=options['burst_size'])
+    for profile in site_profiles:
+        profile_options = profile['options']
+        rate_limiter.configure_site(profile['domain'],
+                                    (profile_options['requests_per_second'], profile_options['min_requests_per_second'],
+                                     profile_options['max_requests_per_second'], profile_options['burst_size']))
+    circuit_breaker = CircuitBreaker(threshold=options['circuit_breaker_threshold'],
+                                     cooldown=options['circuit_breaker_cooldown'])
+    hooks = (circuit_breaker, rate_limiter)
+    if options['collect_metrics']:
+        hooks += (get_metrics(),)
+    return HTTPClient(options, cache=response_cache, hooks=hooks, archive=response_archive)
+
+
+def prepare_environment(base_path, incremental: bool = False):
+    """
+    Creates ASSETS_PATH folder if not created and removes existing folder.
+    In incremental mode existing folder is kept
     """
 
     as_path = Path(base_path)
     if as_path.exists():
+        if incremental:
+            return
         shutil.rmtree(as_path)
     as_path.mkdir(parents=True)
 
@@ -149,6 +748,13 @@ def validate_config(crawler_path):
     with open(crawler_path, 'r', encoding='utf-8') as file:
         config = json.load(file)
 
+    return _validate_seeds(config, DOMAIN)
+
+
+def _validate_seeds(config, domain):
+    """
+    Validates seed URLs and number of articles of a site
+    """
     if "seed_urls" not in config:
         raise IncorrectURLError
 
@@ -156,19 +762,21 @@ def validate_config(crawler_path):
         raise IncorrectNumberOfArticlesError
 
     for seed_url in config["seed_urls"]:
-        if not re.match(DOMAIN, seed_url):
+        if not re.match(domain, seed_url):
             raise IncorrectURLError
 
     seed_urls = config["seed_urls"]
     total_articles = config['total_articles_to_find_and_parse']
 
-    if not seed_urls:
+    # issues are found in the journal archive, seed URLs are optional
+    if not seed_urls and config.get('discovery') != 'archive':
         raise IncorrectURLError
 
     if not isinstance(total_articles, int):
         raise IncorrectNumberOfArticlesError
 
-    if total_articles > 200:
+    # scale mode harvests the whole journal history
+    if total_articles > MAX_ARTICLES and config.get('scale_mode') is not True:
         raise NumberOfArticlesOutOfRangeError
 
     if total_articles <= 0:
@@ -177,16 +785,169 @@ def validate_config(crawler_path):
     return seed_urls, total_articles
 
 
-if __name__ == '__main__':
-    new_seed_urls, new_total_articles = validate_config(CRAWLER_CONFIG_PATH)
-    prepare_environment(ASSETS_PATH)
-    crawler = Crawler(new_seed_urls, new_total_articles)
-    crawler.find_articles()
-    for art_id, art_url in enumerate(crawler.urls):
-        article_parser = HTMLParser(article_url=art_url, article_id=art_id + 1)
-        article = article_parser.parse()
-        if article.text:
-            article.save_raw()
-            print(f'the {art_id + 1} article is successfully downloaded')
+def validate_crawling_options(crawler_path):
+    """
+    Validates optional crawling parameters of the given config
+    and returns them completed with default values
+    """
+    with open(crawler_path, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+
+    return _validate_options(config, CRAWLING_OPTIONS, tuple(CRAWLING_OPTIONS))
+
+
+def _validate_options(config, base_options, names):
+    """
+    Validates options with the given names, the ones not given are taken from base_options
+    """
+    options = dict(base_options)
+    for name in names:
+        default = base_options[name]
+        if name not in config:
+            continue
+        value = config[name]
+        expected_types = (int, float) if isinstance(default, float) else type(default)
+        if isinstance(value, bool) is not isinstance(default, bool) or not isinstance(value, expected_types):
+            raise IncorrectCrawlingOptionError
+        if isinstance(value, (int, float)) and value < 0:
+            raise IncorrectCrawlingOptionError
+        options[name] = value
+
+    positive_options = ('max_in_flight_requests', 'connection_pool_size', 'parser_workers',
+                        'parser_queue_size', 'max_url_attempts', 'burst_size', 'min_requests_per_second',
+                        'connect_timeout', 'request_timeout', 'circuit_breaker_threshold')
+    if any(options[name] <= 0 for name in positive_options):
+        raise IncorrectCrawlingOptionError
+
+    if options['discovery'] not in DISCOVERY_MODES:
+        raise IncorrectCrawlingOptionError
+
+    if not options['min_requests_per_second'] <= options['requests_per_second'] <= options['max_requests_per_second']:
+        raise IncorrectCrawlingOptionError
+
+    _validate_selectors(options['selectors'])
+
+    return options
+
+
+def _validate_selectors(selectors):
+    """
+    Checks that site selectors are known and their page rules compile
+    """
+    if set(selectors) - set(ISSUE_PAGE_SELECTORS) - set(PAGE_FIELDS):
+        raise IncorrectCrawlingOptionError
+    if not all(isinstance(selectors[name], str) for name in ISSUE_PAGE_SELECTORS if name in selectors):
+        raise IncorrectCrawlingOptionError
+    try:
+        for page, fields in PAGE_FIELDS.items():
+            get_page_rules(fields, selectors.get(page))
+    except (TypeError, ValueError, etree.XPathError) as error:
+        raise IncorrectCrawlingOptionError from error
+
+
+def validate_site_profiles(crawler_path, options):
+    """
+    Validates crawl profiles of additional sites given in the config.
+    Returns profiles of all sites, the journal of DOMAIN goes first
+    """
+    with open(crawler_path, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+
+    seed_urls, total_articles = validate_config(crawler_path)
+    profiles = [{'domain': DOMAIN, 'seed_urls': seed_urls, 'total_articles': total_articles, 'options': options}]
+
+    sites = config.get('sites', [])
+    if not isinstance(sites, list):
+        raise IncorrectCrawlingOptionError
+    for site in sites:
+        if not isinstance(site, dict) or not re.match(r'https?://', str(site.get('domain'))):
+            raise IncorrectURLError
+        if set(site) - set(SITE_OPTIONS) - {'domain', 'seed_urls', 'total_articles_to_find_and_parse'}:
+            raise IncorrectCrawlingOptionError
+        if site['domain'] in (profile['domain'] for profile in profiles):
+            raise IncorrectURLError
+        site_seed_urls, site_total_articles = _validate_seeds(site, site['domain'])
+        profiles.append({'domain': site['domain'], 'seed_urls': site_seed_urls,
+                         'total_articles': site_total_articles,
+                         'options': dict(_validate_options(site, options, SITE_OPTIONS), domain=site['domain'])})
+    return profiles
+
 
+def create_site_crawler(site_profile, http_client, keep_collected: bool, resume: bool):
+    """
+    Creates crawler of the site with its own frontier and checkpoint,
+    restores the crawl from the checkpoint if asked to resume
+    """
+    site_options = site_profile['options']
+    crawl_frontier = CrawlFrontier(get_site_path(FRONTIER_PATH, site_profile['domain']),
+                                   site_options['max_url_attempts'])
+    crawl_checkpoint = CrawlCheckpoint(get_site_path(CHECKPOINT_PATH, site_profile['domain']),
+                                       site_options['checkpoint_interval'])
+    if not keep_collected:
+        crawl_frontier.clear()
+        crawl_checkpoint.clear()
+    site_crawler = Crawler(site_profile['seed_urls'], site_profile['total_articles'], site_options,
+                           http_client, frontier=crawl_frontier)
+    if resume and not crawl_checkpoint.restore(site_crawler):
+        print(f'there is no checkpoint of {site_profile["domain"]}, '
+              'collected articles are kept and the crawl starts anew')
+    return site_crawler, site_options, crawl_checkpoint
+
+
+def crawl_sites(site_profiles, options, keep_collected: bool, resume: bool):
+    """
+    Collects articles of all sites in this process
+    """
+    crawl_journal = CrawlJournal(CRAWL_JOURNAL_PATH)
+    if not keep_collected:
+        crawl_journal.clear()
+    if options['collect_metrics']:
+        get_metrics().start_trace(TRACE_PATH)
+    shared_client = create_http_client(options, site_profiles)
+    crawled_sites = [create_site_crawler(site_profile, shared_client, keep_collected, resume)
+                     for site_profile in site_profiles]
+    collect_sites(crawled_sites, crawl_journal, shared_client)
+    compact_articles(crawl_journal)
+    if shared_client.is_expired():
+        print('the crawl is not complete, run with --resume to continue it')
+    else:
+        # the crawl is complete, next incremental crawl has to revisit all URLs to find changed articles
+        for site_crawler, _, crawl_checkpoint in crawled_sites:
+            site_crawler.frontier.clear()
+            crawl_checkpoint.clear()
+
+    shared_client.close()
+    shutdown_extraction_pool()
+    if options['collect_metrics']:
+        get_metrics().stop_trace()
+        get_metrics().save_summary(METRICS_PATH)
+        print(f'crawl metrics are saved to {METRICS_PATH}')
+
+
+def main():
+    """
+    Collects articles of the journals given in the config
+    """
+    arg_parser = argparse.ArgumentParser(description='Collects articles of the journal')
+    arg_parser.add_argument('--resume', action='store_true', help='continue the crawl from the last checkpoint')
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help='number of crawler processes sharing the SQLite frontier')
+    arguments = arg_parser.parse_args()
+
+    crawling_options = validate_crawling_options(CRAWLER_CONFIG_PATH)
+    site_profiles = validate_site_profiles(CRAWLER_CONFIG_PATH, crawling_options)
+    keep_collected = crawling_options['incremental'] or arguments.resume
+    prepare_environment(ASSETS_PATH, keep_collected)
+
+    if arguments.workers > 1:
+        if len(site_profiles) > 1:
+            arg_parser.error('--workers supports crawling of a single site only')
+        crawl_sharded(arguments.workers, site_profiles[0]['seed_urls'], site_profiles[0]['total_articles'],
+                      crawling_options, keep_collected)
+    else:
+        crawl_sites(site_profiles, crawling_options, keep_collected, arguments.resume)
     print("That's all!")
+
+
+if __name__ == '__main__':
+    main()